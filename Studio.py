@@ -1,27 +1,80 @@
-import importlib, os, sys
+import argparse, ast, importlib, json, os, sys, pathlib, time
 
 # === PATH SETUP ===
 HERE = os.path.dirname(os.path.abspath(__file__))
 MODULE_DIR = os.path.join(HERE, "modules")
 STUMOD_DIR = os.path.join(HERE, "stumod")
+BENCH_DIR = os.path.join(HERE, "bench")
+SERVER_DIR = os.path.join(HERE, "server")
 
 # === PLUGIN SYSTEM ===
+# Plugins describe themselves with a module-level literal, read without importing them:
+#   PLUGIN = {"kind": "dialect", "speed": 10, "stepping": True, "render": True,
+#             "profile": True, "cell_bits": (8, 16, 32), "compiled": False}
+# speed ranks dialects for "auto"; files without a manifest still load, with no capabilities.
+_manifests = {}   # file -> (mtime, manifest)
+_loaded = {}      # (path, name) -> module
+
+def read_manifest(file):
+    """The PLUGIN = {...} dict of a plugin file ({} if it has none), parsed with ast."""
+    with open(file, "rb") as f:
+        tree = ast.parse(f.read(), file)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "PLUGIN" for t in node.targets):
+            return ast.literal_eval(node.value)
+    return {}
+
+def discover(path):
+    """{name: manifest} for the plugins in a folder (skipping __init__ and _private helpers)."""
+    found = {}
+    for f in sorted(os.listdir(path)):
+        if f.endswith(".py") and not f.startswith("_"):
+            file = os.path.join(path, f)
+            mtime = os.stat(file).st_mtime_ns
+            cached = _manifests.get(file)
+            if cached is None or cached[0] != mtime:
+                cached = _manifests[file] = (mtime, read_manifest(file))
+            found[f[:-3]] = cached[1]
+    return found
+
 def list_plugins(path):
-    """Return all Python modules (without __init__) inside a folder."""
-    return [f[:-3] for f in os.listdir(path) if f.endswith(".py") and not f.startswith("__")]
+    """Return all Python modules inside a folder (skipping __init__ and _private helpers)."""
+    return list(discover(path))
 
 def load_plugin(path, name):
-    """Import a plugin dynamically from a folder path."""
-    if path not in sys.path:
-        sys.path.insert(0, path)
-    return importlib.import_module(name)
+    """Import a plugin from a folder path; modules are cached after the first load."""
+    key = (path, name)
+    if key not in _loaded:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+        _loaded[key] = importlib.import_module(name)
+    return _loaded[key]
+
+def pick_dialect(needs=(), cell_bits=8, path=MODULE_DIR):
+    """Fastest dialect whose manifest has every capability in needs ("stepping", "render",
+    "profile", ...) and supports cell_bits."""
+    best = None
+    for name, m in discover(path).items():
+        if m.get("kind") != "dialect" or cell_bits not in m.get("cell_bits", ()):
+            continue
+        if all(m.get(k) for k in needs) and (best is None or m.get("speed", 0) > best[0]):
+            best = (m.get("speed", 0), name)
+    if best is None:
+        raise LookupError(f"No dialect supports {', '.join(needs) or 'this run'} with {cell_bits}-bit cells")
+    return best[1]
+
+def load_dialect(name, needs=(), cell_bits=8):
+    """load_plugin for dialects; "auto" picks one with pick_dialect."""
+    if name == "auto":
+        name = pick_dialect(needs, cell_bits)
+    return load_plugin(MODULE_DIR, name)
 
 # === CLI FRONTEND ===
 def cli():
     print("🧠  BFstudioX Modular CLI (PyQt Edition)")
-    print(f"→ modules: {', '.join(list_plugins(MODULE_DIR))}")
+    print(f"→ modules: {', '.join(list_plugins(MODULE_DIR))} (or auto)")
     print(f"→ tools  : {', '.join(list_plugins(STUMOD_DIR))}")
-    print("Type 'run <dialect> <file>' or 'conv <tool> [args]' or 'quit'")
+    print("Type 'run <dialect> <file> [input-file]' or 'conv <tool> [args]' or 'quit'")
 
     while True:
         try:
@@ -34,17 +87,19 @@ def cli():
             break
 
         if cmd.startswith("run "):
-            parts = cmd.split(maxsplit=2)
+            parts = cmd.split(maxsplit=3)
             if len(parts) < 3:
-                print("usage: run <dialect> <file>")
+                print("usage: run <dialect> <file> [input-file]")
                 continue
-            _, dialect, file = parts
+            _, dialect, file = parts[:3]
+            hooks = {"prefix": True}
+            if len(parts) > 3: hooks["input"] = pathlib.Path(parts[3])
             try:
-                module = load_plugin(MODULE_DIR, dialect)
+                module = load_dialect(dialect)
                 with open(file, "r", encoding="utf-8") as f:
                     code = f.read()
                 print(f"→ Running '{file}' with dialect '{dialect}'...")
-                module.run(code, hooks={})
+                module.run(code, hooks=hooks)
             except Exception as e:
                 print("⚠️ Error:", e)
 
@@ -63,10 +118,212 @@ def cli():
                 print("⚠️ Error:", e)
 
         else:
-            print("usage: run <dialect> <file> | conv <tool> [args] | quit")
+            print("usage: run <dialect> <file> [input-file] | conv <tool> [args] | quit")
+
+
+# === BATCH MODE ===
+def find_jobs(target):
+    """Jobs from a directory (<name>.bf plus optional <name>.in / <name>.out) or a JSON-lines
+    manifest of {"program", "input"?, "expected"?, "dialect"?, "max_steps"?, "timeout"?, "prefix"?}."""
+    jobs = []
+    if os.path.isdir(target):
+        for f in sorted(os.listdir(target)):
+            if f.endswith(".bf"):
+                base = os.path.join(target, f[:-3])
+                jobs.append({"program": base + ".bf",
+                             "input": base + ".in" if os.path.isfile(base + ".in") else None,
+                             "expected": base + ".out" if os.path.isfile(base + ".out") else None})
+        return jobs
+    root = os.path.dirname(os.path.abspath(target))
+    with open(target, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                job = json.loads(line)
+                for k in ("program", "input", "expected"):
+                    if job.get(k): job[k] = os.path.join(root, job[k])
+                jobs.append(job)
+    return jobs
+
+def run_job(job):
+    """Run one batch job in the current process and return its result record."""
+    limits = load_plugin(MODULE_DIR, "_limits")
+    res = {"program": job["program"], "dialect": job["dialect"]}
+    chunks = []
+    t0 = time.perf_counter()
+    try:
+        module = load_dialect(job["dialect"])
+        res["dialect"] = module.__name__
+        with open(job["program"], "r", encoding="utf-8") as f:
+            code = f.read()
+        hooks = {"on_output": limits.capped_output(chunks, job.get("max_output")),
+                 "input": pathlib.Path(job["input"]) if job.get("input") else b"", "prefix": bool(job.get("prefix"))}
+        res["steps"] = module.run(code, hooks=hooks, max_steps=job.get("max_steps"), timeout=job.get("timeout"))
+        res["status"] = "ok"
+    except Exception as e:
+        res["status"], res["error"] = limits.outcome(e)
+    res["time"] = round(time.perf_counter() - t0, 6)
+    output = "".join(chunks)
+    res["output_chars"] = len(output)
+    if job.get("expected") and res["status"] == "ok":
+        with open(job["expected"], "rb") as f:
+            expected = f.read().decode("utf-8", "replace")
+        if output != expected:
+            res["status"] = "fail"
+    return res
+
+def batch(argv):
+    ap = argparse.ArgumentParser(prog="Studio.py batch", description="Run many BF programs across a process pool; prints one JSON result per line.")
+    ap.add_argument("target", help="directory of .bf/.in/.out files or a JSON-lines manifest")
+    ap.add_argument("--dialect", default="auto", help="dialect name, or auto for the fastest one")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count())
+    ap.add_argument("--max-steps", type=int, default=None, help="per-job instruction budget")
+    ap.add_argument("--timeout", type=float, default=None, help="per-job wall-clock budget in seconds")
+    ap.add_argument("--max-output", type=int, default=1 << 24, help="per-job output budget in characters")
+    ap.add_argument("--prefix", action="store_true", help="start jobs from their precomputed input-free prefix")
+    args = ap.parse_args(argv)
+
+    jobs = find_jobs(args.target)
+    for job in jobs:
+        job.setdefault("dialect", args.dialect)
+        job.setdefault("max_steps", args.max_steps)
+        job.setdefault("timeout", args.timeout)
+        job.setdefault("max_output", args.max_output)
+        job.setdefault("prefix", args.prefix)
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed   # only batch needs it
+    counts = {}
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for fut in as_completed([pool.submit(run_job, job) for job in jobs]):
+            res = fut.result()
+            counts[res["status"]] = counts.get(res["status"], 0) + 1
+            print(json.dumps(res), flush=True)
+    print(f"{len(jobs)} jobs: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())), file=sys.stderr)
+    return 0 if counts.get("ok", 0) == len(jobs) else 1
+
+# === SINGLE RUN ===
+def run(argv):
+    ap = argparse.ArgumentParser(prog="Studio.py run", description="Run one BF program, output to stdout.")
+    ap.add_argument("program")
+    ap.add_argument("--dialect", default="auto", help="dialect name, or auto for the fastest one")
+    ap.add_argument("--input", help="file read by ',' (default: stdin)")
+    ap.add_argument("--cell-bits", type=int, default=8, choices=(8, 16, 32))
+    ap.add_argument("--no-prefix", action="store_true", help="don't start from the precomputed input-free prefix")
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--timeout", type=float, default=None)
+    args = ap.parse_args(argv)
 
+    module = load_dialect(args.dialect, cell_bits=args.cell_bits)
+    with open(args.program, "r", encoding="utf-8") as f:
+        code = f.read()
+    hooks = {"prefix": not args.no_prefix}
+    if args.input: hooks["input"] = pathlib.Path(args.input)
+    try:
+        module.run(code, hooks=hooks, cell_bits=args.cell_bits, max_steps=args.max_steps, timeout=args.timeout)
+    except Exception as e:
+        print(f"\n⚠️ Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+# === LANES ===
+def lanes(argv):
+    ap = argparse.ArgumentParser(prog="Studio.py lanes", description="Run one BF program over many inputs at once (NumPy); prints one JSON result per input.")
+    ap.add_argument("program")
+    ap.add_argument("inputs", help="directory of <name>.in files (optional <name>.out: expected output) "
+                                   "or a text file with one input per line (newline included)")
+    ap.add_argument("--eof", choices=("0", "-1", "none"), default="0", help="what ',' stores at end of input")
+    ap.add_argument("--max-steps", type=int, default=None, help="per-input instruction budget")
+    ap.add_argument("--timeout", type=float, default=None, help="wall-clock budget for the whole run in seconds")
+    args = ap.parse_args(argv)
+
+    with open(args.program, "r", encoding="utf-8") as f:
+        code = f.read()
+    names, inputs, expected = [], [], []
+    if os.path.isdir(args.inputs):
+        for f in sorted(os.listdir(args.inputs)):
+            if f.endswith(".in"):
+                base = os.path.join(args.inputs, f[:-3])
+                with open(base + ".in", "rb") as fh:
+                    inputs.append(fh.read())
+                names.append(base + ".in")
+                expected.append(None)
+                if os.path.isfile(base + ".out"):
+                    with open(base + ".out", "rb") as fh:
+                        expected[-1] = fh.read()
+    else:
+        with open(args.inputs, "rb") as f:
+            inputs = f.read().splitlines(keepends=True)
+        names = [f"line {i + 1}" for i in range(len(inputs))]
+        expected = [None] * len(inputs)
+
+    t0 = time.perf_counter()
+    try:
+        results = load_plugin(MODULE_DIR, "_lanes").run(code, inputs, eof=None if args.eof == "none" else int(args.eof),
+                                                         max_steps=args.max_steps, timeout=args.timeout)
+    except (RuntimeError, SyntaxError) as e:
+        print(f"⚠️ Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - t0
+    counts = {}
+    for name, lane, want in zip(names, results, expected):
+        status = "fail" if lane.status == "ok" and want is not None and lane.output != want else lane.status
+        counts[status] = counts.get(status, 0) + 1
+        res = {"input": name, "status": status, "steps": lane.steps, "output": lane.output.decode("utf-8", "replace")}
+        if lane.error: res["error"] = lane.error
+        print(json.dumps(res))
+    print(f"{len(results)} inputs in {elapsed:.3f}s: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())), file=sys.stderr)
+    return 0 if counts.get("ok", 0) == len(results) else 1
+
+# === BENCHMARKS ===
+def bench(argv):
+    harness = load_plugin(BENCH_DIR, "harness")
+    return harness.main(argv, list_plugins(MODULE_DIR), lambda name: load_plugin(MODULE_DIR, name))
+
+# === EXECUTION SERVICE ===
+def serve(argv):
+    service = load_plugin(SERVER_DIR, "service")
+    dialects = [name for name, m in discover(MODULE_DIR).items() if m.get("kind") == "dialect"]
+    return service.main(argv, MODULE_DIR, dialects, pick_dialect)
+
+def load(argv):
+    return load_plugin(SERVER_DIR, "loadgen").main(argv)
+
+# === PROFILER ===
+def prof(argv):
+    ap = argparse.ArgumentParser(prog="Studio.py prof", description="Run a BF program and report its hottest loops and lines.")
+    ap.add_argument("program")
+    ap.add_argument("--dialect", default="auto", help="dialect name, or auto for the fastest one")
+    ap.add_argument("--input", help="file read by ',' (default: stdin)")
+    ap.add_argument("--top", type=int, default=20, help="rows per table")
+    ap.add_argument("--quiet", action="store_true", help="discard the program's own output")
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--timeout", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    module = load_dialect(args.dialect, ("profile",))
+    profile = load_plugin(MODULE_DIR, "_profile").Profile()
+    with open(args.program, "r", encoding="utf-8") as f:
+        code = f.read()
+    hooks = {"profile": profile}
+    if args.input: hooks["input"] = pathlib.Path(args.input)
+    if args.quiet: hooks["on_output"] = lambda s: None
+    status = 0
+    try:
+        module.run(code, hooks=hooks, max_steps=args.max_steps, timeout=args.timeout)
+    except Exception as e:
+        # still report: a profile of a run that hit a limit shows where it was spinning
+        print(f"\n⚠️ Error: {e}", file=sys.stderr)
+        status = 1
+    print("\n" + profile.report(args.top))
+    return status
+
+COMMANDS = {"run": run, "batch": batch, "lanes": lanes, "bench": bench, "prof": prof, "serve": serve, "load": load}
 
 # === ENTRYPOINTS ===
-if __name__ == "__main__":
-    # if called directly: CLI mode
+def main(argv):
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    # no subcommand: interactive CLI mode
     cli()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
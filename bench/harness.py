@@ -0,0 +1,102 @@
+"""Benchmark harness: runs every dialect over the bundled corpus.
+
+The corpus (bench/corpus/manifest.json) lists each workload with the number of BF
+instructions the reference classic interpreter executes (bf_steps) and the SHA-1 of its
+output (and, for render workloads, the number of frames), so every engine is checked for
+correctness and compared on the same unit:
+BF instructions per second = bf_steps / wall time.
+"""
+import argparse, hashlib, json, os, time, tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+TEXT = b"The quick brown fox jumps over the lazy dog.\n"
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    with open(os.path.join(corpus_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    for name, w in spec.items():
+        with open(os.path.join(corpus_dir, w["program"]), "r", encoding="utf-8") as f:
+            w["code"] = f.read()
+        n = w.get("input_bytes", 0)
+        w["input"] = (TEXT * (n // len(TEXT) + 1))[:n]
+    return spec
+
+def run_once(module, w):
+    """Run a workload once: (seconds, engine steps, output sha1, frames rendered)."""
+    out = []
+    frames = [0]
+    def on_render(buf, width, height):
+        frames[0] += 1
+    hooks = {"on_output": out.append, "input": w["input"]}
+    if w.get("render"):
+        hooks["on_render"] = on_render
+        if w.get("framebuffer"): hooks["framebuffer"] = w["framebuffer"]
+    t0 = time.perf_counter()
+    steps = module.run(w["code"], hooks=hooks)
+    elapsed = time.perf_counter() - t0
+    return elapsed, steps, hashlib.sha1("".join(out).encode()).hexdigest(), frames[0]
+
+def bench(module, w, repeat=3, memory=True):
+    """Best-of-repeat timing plus (optionally) a separate traced run for peak memory."""
+    res = {}
+    try:
+        best = None
+        for _ in range(repeat):
+            elapsed, steps, digest, frames = run_once(module, w)
+            best = elapsed if best is None else min(best, elapsed)
+        res.update(time=best, steps=steps, ips=w["bf_steps"] / best if best else None,
+                   ok=digest == w["output_sha1"] and frames == w.get("frames", frames))
+        if memory:
+            tracemalloc.start()
+            try:
+                run_once(module, w)
+                res["peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        res.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return res
+
+def fmt_ips(v):
+    if v is None: return "-"
+    for unit, div in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if v >= div: return f"{v / div:.2f}{unit}"
+    return f"{v:.0f}"
+
+def main(argv, dialects, load):
+    """argv: CLI args; dialects: available dialect names; load(name) -> engine module."""
+    ap = argparse.ArgumentParser(prog="Studio.py bench", description="Benchmark dialect engines on the bundled corpus.")
+    ap.add_argument("--dialects", default=",".join(dialects), help="comma-separated dialects (default: all)")
+    ap.add_argument("--workloads", default=None, help="comma-separated workloads (default: all)")
+    ap.add_argument("--corpus", default=CORPUS_DIR)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    ap.add_argument("--baseline", help="JSON from a previous --save to compare against")
+    ap.add_argument("--save", help="write results as JSON")
+    args = ap.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    names = args.workloads.split(",") if args.workloads else list(corpus)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(f"{'dialect':<10} {'workload':<10} {'time s':>9} {'BF instr/s':>11} {'peak KB':>8}  {'vs base':>8}  status")
+    for d in args.dialects.split(","):
+        module = load(d)
+        for name in names:
+            r = bench(module, corpus[name], args.repeat, not args.no_memory)
+            results.setdefault(d, {})[name] = r
+            base = baseline.get(d, {}).get(name, {}).get("time")
+            vs = f"{base / r['time']:.2f}x" if base and r.get("time") else "-"
+            status = "ok" if r["ok"] else r.get("error", "WRONG OUTPUT")
+            t = f"{r['time']:.4f}" if r.get("time") is not None else "-"
+            print(f"{d:<10} {name:<10} {t:>9} {fmt_ips(r.get('ips')):>11} {r.get('peak_kb', '-'):>8}  {vs:>8}  {status}", flush=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    return 0 if all(r["ok"] for per in results.values() for r in per.values()) else 1
@@ -0,0 +1,5 @@
+# python3 -m ide_qt: multiprocessing's spawned engine processes (_process) skip re-running a
+# package's __main__, so they start without importing the GUI (and PyQt6)
+from .main import main
+
+main()
@@ -0,0 +1,69 @@
+from PyQt6.QtWidgets import QPlainTextEdit
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtCore import QTimer
+from collections import deque
+import threading
+
+class OutputBuffer:
+    """Thread-safe ring buffer of text chunks; keeps at most max_bytes, dropping the oldest."""
+    def __init__(self, max_bytes=1 << 20):
+        self.max_bytes = max_bytes
+        self.chunks = deque()
+        self.size = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def write(self, s):
+        with self.lock:
+            self.chunks.append(s)
+            self.size += len(s)
+            while self.size > self.max_bytes and len(self.chunks) > 1:
+                old = self.chunks.popleft()
+                self.size -= len(old)
+                self.dropped += len(old)
+
+    def drain(self):
+        """Return (text, dropped) accumulated since the last drain."""
+        with self.lock:
+            text = "".join(self.chunks)
+            dropped = self.dropped
+            self.chunks.clear()
+            self.size = self.dropped = 0
+        if len(text) > self.max_bytes:
+            dropped += len(text) - self.max_bytes
+            text = text[-self.max_bytes:]
+        return text, dropped
+
+class Console(QPlainTextEdit):
+    """Read-only plain-text output pane fed from an OutputBuffer on a timer.
+    The engine thread only touches the buffer; the widget appends everything that
+    arrived since the last tick in one insert and keeps at most max_lines lines.
+    """
+    def __init__(self, max_lines=10000, max_bytes=1 << 20, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.buffer = OutputBuffer(max_bytes)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.drain)
+        self.timer.start(interval_ms)
+
+    def write(self, s):
+        """Thread-safe: queue text for the next drain."""
+        self.buffer.write(s)
+
+    def drain(self):
+        text, dropped = self.buffer.drain()
+        if dropped:
+            self.append_error(f"[… {dropped} characters of output dropped …]")
+        if text:
+            self.moveCursor(QTextCursor.MoveOperation.End)
+            self.insertPlainText(text)
+            self.moveCursor(QTextCursor.MoveOperation.End)
+
+    def append_error(self, text):
+        self.appendHtml(f"<span style='color:#f44747'>{text.replace('&', '&amp;').replace('<', '&lt;')}</span>")
+
+    def clear(self):
+        self.buffer.drain()
+        super().clear()
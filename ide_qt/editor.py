@@ -0,0 +1,81 @@
+from PyQt6.QtWidgets import QPlainTextEdit, QWidget
+from PyQt6.QtGui import QPainter, QColor
+from PyQt6.QtCore import Qt, QRect, QSize
+
+class Gutter(QWidget):
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+
+    def sizeHint(self):
+        return QSize(self.editor.gutter_width(), 0)
+
+    def paintEvent(self, ev):
+        self.editor.paint_gutter(ev)
+
+    def mousePressEvent(self, ev):
+        block = self.editor.cursorForPosition(ev.position().toPoint()).block()
+        self.editor.toggle_breakpoint(block.blockNumber())
+
+class CodeEditor(QPlainTextEdit):
+    """Plain text editor with a line-number gutter; clicking the gutter toggles a breakpoint."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.breakpoints = set()  # block (line) numbers
+        self.gutter = Gutter(self)
+        self.blockCountChanged.connect(lambda _: self.setViewportMargins(self.gutter_width(), 0, 0, 0))
+        self.updateRequest.connect(self.on_update_request)
+        self.setViewportMargins(self.gutter_width(), 0, 0, 0)
+
+    def gutter_width(self):
+        digits = len(str(max(1, self.blockCount())))
+        return 22 + self.fontMetrics().horizontalAdvance("9") * digits
+
+    def on_update_request(self, rect, dy):
+        if dy:
+            self.gutter.scroll(0, dy)
+        else:
+            self.gutter.update(0, rect.y(), self.gutter.width(), rect.height())
+
+    def resizeEvent(self, ev):
+        super().resizeEvent(ev)
+        cr = self.contentsRect()
+        self.gutter.setGeometry(QRect(cr.left(), cr.top(), self.gutter_width(), cr.height()))
+
+    def toggle_breakpoint(self, line):
+        self.breakpoints ^= {line}
+        self.gutter.update()
+
+    def clear_breakpoints(self):
+        self.breakpoints.clear()
+        self.gutter.update()
+
+    def breakpoint_offsets(self):
+        """Source offsets of the first character of every breakpoint line."""
+        doc = self.document()
+        return sorted(doc.findBlockByNumber(n).position() for n in self.breakpoints if n < doc.blockCount())
+
+    def show_position(self, pos):
+        cur = self.textCursor()
+        cur.setPosition(min(pos, len(self.toPlainText())))
+        self.setTextCursor(cur)
+        self.centerCursor()
+
+    def paint_gutter(self, ev):
+        p = QPainter(self.gutter)
+        p.fillRect(ev.rect(), QColor("#1e1e1e"))
+        block = self.firstVisibleBlock()
+        top = round(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
+        h = self.fontMetrics().height()
+        while block.isValid() and top <= ev.rect().bottom():
+            n = block.blockNumber()
+            if block.isVisible():
+                if n in self.breakpoints:
+                    p.setBrush(QColor("#e51400"))
+                    p.setPen(Qt.PenStyle.NoPen)
+                    p.drawEllipse(4, top + (h - 10) // 2, 10, 10)
+                p.setPen(QColor("#858585"))
+                p.drawText(0, top, self.gutter.width() - 4, h, Qt.AlignmentFlag.AlignRight, str(n + 1))
+            top += round(self.blockBoundingRect(block).height())
+            block = block.next()
+        p.end()
@@ -1,6 +1,7 @@
-
 from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
-from PyQt6.QtCore import QRegularExpression
+from PyQt6.QtCore import QTimer
+from itertools import groupby
+import math, re
 
 # VS Code-ish colors
 C_BG = "#1e1e1e"
@@ -12,49 +13,158 @@ C_KEYWORD = "#4ec9b0"
 C_BFOP = "#8be9fd"
 C_MISC = "#c586c0"
 
-class PyHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent):
+LARGE_DOC = 1 << 20   # characters; above this only blocks on screen are highlighted
+
+def fmt(color, bold=False, italic=False):
+    f = QTextCharFormat()
+    f.setForeground(QColor(color))
+    if bold: f.setFontWeight(QFont.Weight.Bold)
+    if italic: f.setFontItalic(True)
+    return f
+
+class LazyHighlighter(QSyntaxHighlighter):
+    """Base for the editor highlighters. Given the editor (view), documents over LARGE_DOC
+    characters switch to highlighting only the blocks on screen: the others are left plain
+    (block state 0) and get highlighted once they are scrolled into view.
+    """
+    def __init__(self, parent, view=None):
         super().__init__(parent)
-        self.rules = []
-
-        def fmt(color, bold=False, italic=False):
-            f = QTextCharFormat()
-            f.setForeground(QColor(color))
-            if bold: f.setFontWeight(QFont.Weight.Bold)
-            if italic: f.setFontItalic(True)
-            return f
-
-        keywords = r"\b(False|None|True|and|as|assert|async|await|break|class|continue|def|del|elif|else|except|finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|return|try|while|with|yield)\b"
-        self.rules.append((QRegularExpression(keywords), fmt(C_KEYWORD, True)))
-        self.rules.append((QRegularExpression(r'#[^\n]*'), fmt(C_COMMENT, italic=True)))
-        self.rules.append((QRegularExpression(r'".*?"'), fmt(C_STRING)))
-        self.rules.append((QRegularExpression(r"'.*?'") , fmt(C_STRING)))
-        self.rules.append((QRegularExpression(r'\b\d+(\.\d+)?\b'), fmt(C_NUMBER)))
-        self.rules.append((QRegularExpression(r'\b(print)\b'), fmt(C_MISC, True)))
+        self.view = view
+        self.visible = (0, -1)   # block numbers on screen, large documents only
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(30)
+        self.timer.timeout.connect(self.highlight_visible)
+        self.on_update = lambda rect, dy: self.timer.start()
+        if view is not None:
+            view.verticalScrollBar().valueChanged.connect(self.timer.start)
+            view.updateRequest.connect(self.on_update)
+
+    def detach(self):
+        """Disconnect from the view and the document and schedule deletion; the editor calls
+        this instead of setDocument(None) when it switches highlighters."""
+        self.timer.stop()
+        if self.view is not None:
+            self.view.verticalScrollBar().valueChanged.disconnect(self.timer.start)
+            self.view.updateRequest.disconnect(self.on_update)
+            self.view = None
+        self.setDocument(None)
+        self.deleteLater()
+
+    def large(self):
+        doc = self.document()
+        return self.view is not None and doc is not None and doc.characterCount() > LARGE_DOC
+
+    def deferred(self):
+        """True if the current block should be left for later; call first in highlightBlock."""
+        if not self.large():
+            self.setCurrentBlockState(1)
+            return False
+        n = self.currentBlock().blockNumber()
+        if self.visible[0] <= n <= self.visible[1]:
+            self.setCurrentBlockState(1)
+            return False
+        self.setCurrentBlockState(0)
+        return True
+
+    def highlight_visible(self):
+        if not self.large():
+            return
+        view, block = self.view, self.view.firstVisibleBlock()
+        first, bottom = block.blockNumber(), view.viewport().height()
+        offset = view.contentOffset()
+        todo, last = [], first
+        while block.isValid() and view.blockBoundingGeometry(block).translated(offset).top() <= bottom:
+            if block.userState() != 1:
+                todo.append(block)
+            last = block.blockNumber()
+            block = block.next()
+        self.visible = (first, last)
+        for b in todo:
+            self.rehighlightBlock(b)
+
+class PyHighlighter(LazyHighlighter):
+    # one pass over each block: comments and strings come first, so a '#' inside a string
+    # or a keyword inside a comment is not highlighted
+    TOKENS = re.compile(
+        r"(?P<comment>#.*)"
+        r"|(?P<string>\"[^\"]*\"?|'[^']*'?)"
+        r"|\b(?P<keyword>False|None|True|and|as|assert|async|await|break|class|continue|def|del|elif|else|except|finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|return|try|while|with|yield)\b"
+        r"|\b(?P<number>\d+(\.\d+)?)\b"
+        r"|\b(?P<misc>print)\b")
+
+    def __init__(self, parent, view=None):
+        super().__init__(parent, view)
+        self.formats = {"keyword": fmt(C_KEYWORD, True), "comment": fmt(C_COMMENT, italic=True),
+                        "string": fmt(C_STRING), "number": fmt(C_NUMBER), "misc": fmt(C_MISC, True)}
 
     def highlightBlock(self, text):
-        for rx, form in self.rules:
-            it = rx.globalMatch(text)
-            while it.hasNext():
-                m = it.next()
-                self.setFormat(m.capturedStart(), m.capturedLength(), form)
-
-class BFHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.f_op = QTextCharFormat()
-        self.f_op.setForeground(QColor(C_BFOP))
-        self.f_op.setFontWeight(QFont.Weight.Bold)
+        if self.deferred():
+            return
+        for m in self.TOKENS.finditer(text):
+            self.setFormat(m.start(), m.end() - m.start(), self.formats[m.lastgroup])
+
+HEAT_LEVELS = 8
+C_HEAT = "#a1260d"
+
+class BFHighlighter(LazyHighlighter):
+    # runs of operators / of anything else, so each run costs one setFormat
+    RUNS = re.compile(r"[][><+\-,.]+|[^][><+\-,.]+")
+
+    def __init__(self, parent, view=None):
+        super().__init__(parent, view)
+        self.f_op = fmt(C_BFOP, True)
+        self.f_comment = fmt(C_COMMENT)
+
+        # heat map: op format on a background blended from C_BG towards C_HEAT
+        self.heat = None
+        self.f_heat = []
+        bg, hot = QColor(C_BG), QColor(C_HEAT)
+        for k in range(1, HEAT_LEVELS + 1):
+            t = k / HEAT_LEVELS
+            f = QTextCharFormat(self.f_op)
+            f.setBackground(QColor(int(bg.red() + (hot.red() - bg.red()) * t),
+                                   int(bg.green() + (hot.green() - bg.green()) * t),
+                                   int(bg.blue() + (hot.blue() - bg.blue()) * t)))
+            self.f_heat.append(f)
+        self.document().contentsChange.connect(self.on_contents_change)
+
+    def detach(self):
+        self.document().contentsChange.disconnect(self.on_contents_change)
+        super().detach()
+
+    def set_heat(self, counts):
+        """Overlay per-offset execution counts (from _profile.Profile.counts), log-scaled;
+        None clears it. Editing the text clears it too, since offsets no longer match."""
+        self.heat = None
+        if counts:
+            top = math.log1p(max(counts))
+            if top:
+                self.heat = [min(HEAT_LEVELS - 1, int(math.log1p(n) / top * HEAT_LEVELS)) if n else -1 for n in counts]
+        self.rehighlight()
 
-        self.f_comment = QTextCharFormat()
-        self.f_comment.setForeground(QColor(C_COMMENT))
+    def on_contents_change(self, pos, removed, added):
+        if self.heat is not None and (removed or added):
+            self.heat = None
+            QTimer.singleShot(0, self.rehighlight)
 
     def highlightBlock(self, text):
         # highlight only ><+-,.[]
-        i = 0
-        while i < len(text):
-            if text[i] in '><+-,.[]':
-                self.setFormat(i, 1, self.f_op)
+        if self.deferred():
+            return
+        heat, base = self.heat, self.currentBlock().position()
+        for m in self.RUNS.finditer(text):
+            start, end = m.span()
+            if text[start] not in '><+-,.[]':
+                self.setFormat(start, end - start, self.f_comment)
+            elif heat is None:
+                self.setFormat(start, end - start, self.f_op)
             else:
-                self.setFormat(i, 1, self.f_comment)
-            i += 1
+                # split the run where the heat level changes
+                levels = heat[base + start:base + end]
+                for lvl, group in groupby(levels):
+                    n = len(list(group))
+                    self.setFormat(start, n, self.f_heat[lvl] if lvl >= 0 else self.f_op)
+                    start += n
+                if start < end:
+                    self.setFormat(start, end - start, self.f_op)
@@ -1,41 +1,132 @@
-
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QPlainTextEdit, QPushButton,
-    QVBoxLayout, QHBoxLayout, QWidget, QComboBox, QTextEdit, QLabel,
-    QFileDialog, QSplitter, QToolBar, QStatusBar, QMessageBox
+    QVBoxLayout, QHBoxLayout, QWidget, QComboBox, QLabel,
+    QFileDialog, QSplitter, QToolBar, QStatusBar, QMessageBox,
+    QSpinBox, QInputDialog
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QAction, QFont
-import sys, os, io, threading
+import sys, io, threading, time, queue, codecs, hashlib
 
-from Studio import MODULE_DIR, STUMOD_DIR, load_plugin
+from Studio import MODULE_DIR, STUMOD_DIR, list_plugins, load_plugin, load_dialect, pick_dialect
 from .tapeview import TapeView
+from .editor import CodeEditor
+from .console import Console
 from .renderwindow import RenderWindow
 from .highlighter import PyHighlighter, BFHighlighter, C_BG, C_TEXT
 
 class Runner(QThread):
-    output_signal = pyqtSignal(str)
+    REFRESH_HZ = 30      # max tape updates per second while running at full speed
+
     error_signal = pyqtSignal(str)
     done_signal = pyqtSignal()
-    update_tape = pyqtSignal(list, int)
-    update_render = pyqtSignal(list, int, int)
+    update_tape = pyqtSignal(int, object, int, int)   # window start, [(start, data)], ptr, tape length
+    found_signal = pyqtSignal(int)
+    break_signal = pyqtSignal(int)
 
-    def __init__(self, dialect, code, pause_event, step_once_event):
+    def __init__(self, dialect, code, pause_event, step_once_event, breakpoints=(), stdin=b"", write=print, profile=None,
+                 framebuffer=None, render=None, window=(0, 1024)):
         super().__init__()
         self.dialect = dialect
         self.code = code
+        self.write = write  # thread-safe output sink (Console.write)
+        self.stdin = stdin
         self.pause_event = pause_event
         self.step_once_event = step_once_event
+        self.breakpoints = list(breakpoints)
+        self.profile = profile   # _profile.Profile to fill, or None
+        self.framebuffer = framebuffer
+        self.render = render     # thread-safe frame sink (RenderWindow.post)
+        self.tapes = load_plugin(MODULE_DIR, "_tape")
+        # the IDE never copies the whole tape: it asks for the cells on screen (set_window)
+        # and gets the chunks of that window that changed since the last publish
+        self.window = window
+        self.mirror = (None, None)   # (window, snapshot) last published
+        self.queries = queue.SimpleQueue()
+        self.live = None             # the engine's tape, once a hook has seen it
+        self.live_ptr = 0
+        self.last_ptr = -1
+        self.last_publish = 0.0
+        self.stopped = False
+
+    def needs(self):
+        # the IDE always installs stepping hooks (Pause/Step), so "auto" picks among stepping dialects
+        return ("stepping",) + (("profile",) if self.profile else ()) + (("render",) if self.render else ())
+
+    # controls, called from the GUI thread
+    def pause(self):
+        self.pause_event.set()
+
+    def step(self):
+        self.pause_event.set()
+        self.step_once_event.set()
+
+    def resume(self):
+        self.pause_event.clear()
+
+    def stop(self):
+        # the engine only notices on its next poll/tick
+        self.stopped = True
+        self.pause_event.clear()
+
+    def close(self):
+        """Wait for the run to end (after stop()) and release what it still holds."""
+        self.wait()
+
+    def set_window(self, start, count):
+        """GUI side: cells [start, start+count) are on screen."""
+        self.window = (start, count)
+        if self.isFinished():
+            self.publish(force=True)   # the engine is gone, serve from its final tape
+
+    def find(self, value, start):
+        """GUI side: search the tape for value from start; answered with found_signal."""
+        self.queries.put((value, start))
+        if self.isFinished():
+            self.serve()
+
+    def serve(self):
+        while self.live is not None and not self.queries.empty():
+            value, start = self.queries.get()
+            self.found_signal.emit(self.tapes.find(self.live, value, start))
+
+    def publish(self, force=False):
+        # send only the chunks of the window that changed since the last publish, at most REFRESH_HZ times a second
+        tape, ptr = self.live, self.live_ptr
+        if tape is None:
+            return
+        now = time.monotonic()
+        window = self.window
+        if not force and window == self.mirror[0] and now - self.last_publish < 1.0 / self.REFRESH_HZ:
+            return
+        self.last_publish = now
+        start, count = window
+        cur = self.tapes.snapshot(tape, start, start + count)
+        diffs = self.tapes.dirty_ranges(self.mirror[1] if window == self.mirror[0] else None, cur)
+        self.mirror = (window, cur)
+        if diffs or ptr != self.last_ptr:
+            self.last_ptr = ptr
+            self.update_tape.emit(start, [(start + s, d) for s, d in diffs], ptr, len(tape))
 
     def run(self):
         try:
-            mod = load_plugin(MODULE_DIR, self.dialect)
+            mod = load_dialect(self.dialect, self.needs())
+
+            def publish(tape, ptr, force=False):
+                self.live, self.live_ptr = tape, ptr
+                self.serve()
+                self.publish(force)
 
-            def on_output(s): self.output_signal.emit(s)
-            def on_step(tape, ptr): self.update_tape.emit(tape[:4096], ptr)
-            def on_render(buf, w, h): self.update_render.emit(buf, w, h)
+            def on_output(s): self.write(s)
+            # on_step only fires while stepping (paused, Step, breakpoints), so every step is shown exactly
+            def on_step(tape, ptr): publish(tape, ptr, force=True)
+            def on_render(buf, w, h):
+                # buf is a view into the live tape: copy it before crossing threads
+                frame = bytes(buf) if buf.format == "B" else bytes(v & 0xFF for v in buf)
+                self.render(frame, w, h)
 
             def tick():
+                if self.stopped: raise RuntimeError("Stopped")
                 # if paused, wait until unpaused or step_once used
                 if self.pause_event.is_set():
                     # wait for step once or unpause
@@ -44,15 +135,181 @@ class Runner(QThread):
                             # consume single step
                             self.step_once_event.clear()
                             break
+                        # the tape is ours while paused: answer scrolling and searches
+                        self.serve()
+                        if self.window != self.mirror[0]: self.publish()
                         self.msleep(1)
-
-            hooks = {'on_output': on_output, 'on_step': on_step, 'on_render': on_render, 'tick': tick}
+                    if self.stopped: raise RuntimeError("Stopped")
+
+            # full speed until Pause/Step or a breakpoint; then per-instruction tick/on_step
+            def poll(tape, ptr):
+                if self.stopped: raise RuntimeError("Stopped")
+                publish(tape, ptr)
+                return self.pause_event.is_set()
+            def on_break(pos):
+                self.pause_event.set()
+                self.break_signal.emit(pos)
+
+            hooks = {'on_output': on_output, 'on_step': on_step, 'on_render': on_render if self.render else None, 'tick': tick,
+                     'poll': poll, 'breakpoints': self.breakpoints, 'on_break': on_break,
+                     'input': self.stdin, 'eof': 0, 'profile': self.profile, 'framebuffer': self.framebuffer}
             mod.run(self.code, hooks=hooks)
         except Exception as e:
             self.error_signal.emit(str(e))
         finally:
             self.done_signal.emit()
 
+class ProcessRunner(Runner):
+    """Runner that hosts the engine in a child process (_process), so the interpreter and the
+    GUI don't share a GIL. The tape and the render frames live in shared memory: this thread
+    publishes tape windows and answers searches straight from it, and the render window
+    reads frames from it on its own timer. Pause/Step/Continue go over a pipe; Stop kills.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        procs = load_plugin(MODULE_DIR, "_process")
+        try:
+            dialect = pick_dialect(self.needs()) if self.dialect == "auto" else self.dialect
+            self.proc = procs.Process(dialect, self.code, breakpoints=self.breakpoints, input=self.stdin,
+                                      framebuffer=self.framebuffer if self.render else None, profile=self.profile)
+        except Exception as e:
+            self.proc, self.failure = None, str(e)
+        else:
+            self.live = self.proc.tape
+
+    def frame(self):
+        """Newest frame for RenderWindow.watch."""
+        return self.proc.frame() if self.proc else None
+
+    def pause(self):
+        if self.proc: self.proc.send("pause")
+
+    def step(self):
+        if self.proc: self.proc.send("step")
+
+    def resume(self):
+        if self.proc: self.proc.send("cont")
+
+    def stop(self):
+        if self.proc: self.proc.kill()
+
+    def close(self):
+        if self.proc:
+            self.wait()
+            self.live = None
+            self.proc.close()
+            self.proc = None
+
+    def run(self):
+        if self.proc is None:
+            self.error_signal.emit(self.failure)
+            self.done_signal.emit()
+            return
+        try:
+            self.proc.start()
+            while not self.proc.done:
+                for kind, arg in self.proc.messages(1.0 / self.REFRESH_HZ):
+                    if kind == "out": self.write(arg)
+                    elif kind == "break": self.break_signal.emit(arg)
+                    elif kind == "error": self.error_signal.emit(arg)
+                self.live_ptr = self.proc.ptr()
+                self.serve()
+                self.publish()
+            self.publish(force=True)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            self.done_signal.emit()
+
+class HistoryRunner(Runner):
+    """Runner that can go backwards: the program runs on a _history.History in this thread,
+    which checkpoints it as it goes, so Back and Back to write rewind by restoring a checkpoint
+    and replaying. It always executes the folded IR (as `optimized` does) whatever the dialect,
+    and doesn't render. The run stays open at the end of the program until Stop or the next Run.
+    """
+    SLICE = 1 << 16   # instructions between looks at the command queue
+
+    rewind_signal = pyqtSignal(str)          # whole output up to the new position, after going back
+    position_signal = pyqtSignal(int, int)   # source offset, instructions executed; sent while stopped
+
+    def __init__(self, *args, budget=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+        self.commands = queue.SimpleQueue()
+
+    def pause(self): self.commands.put(("pause", None))
+    def step(self): self.commands.put(("step", None))
+    def resume(self): self.commands.put(("cont", None))
+    def back(self, count=1): self.commands.put(("back", count))
+    def back_to_write(self, cell): self.commands.put(("write", cell))
+
+    def stop(self):
+        self.stopped = True
+        self.commands.put(("stop", None))
+
+    def run(self):
+        try:
+            hist = load_plugin(MODULE_DIR, "_history")
+            history = hist.History(self.code, self.stdin, budget=self.budget or hist.BUDGET)
+            m = history.machine
+            m.set_breakpoints(self.breakpoints)
+            running, shown, where = not self.pause_event.is_set(), 0, None
+            decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+            def forward(count):
+                # a run-time error stops here instead of ending the run, so Back can find its cause
+                try:
+                    history.forward(count)
+                except RuntimeError as e:
+                    self.error_signal.emit(str(e))
+                    return False
+                return True
+            while not self.stopped:
+                cmd = None
+                if running and not history.done:
+                    if not forward(self.SLICE):
+                        running = False
+                    elif m.break_at >= 0:
+                        running = False
+                        self.break_signal.emit(m.break_at)
+                else:
+                    running = False
+                    try:
+                        cmd = self.commands.get(timeout=1.0 / self.REFRESH_HZ)
+                    except queue.Empty:
+                        pass
+                while cmd or not self.commands.empty():
+                    kind, arg = cmd or self.commands.get()
+                    cmd = None
+                    if kind == "stop": break
+                    elif kind == "cont": running = True
+                    else:
+                        running = False
+                        if kind == "step": forward(1)
+                        elif kind == "back": history.back(arg)
+                        elif kind == "write" and history.last_write(arg) is None:
+                            self.error_signal.emit(f"Nothing wrote cell {arg} before this point")
+                # shown and total count from the very first byte; history.output may have lost its oldest part
+                out, base = history.output, history.trimmed
+                total = base + len(out)
+                if total < shown:
+                    decoder.reset()
+                    self.rewind_signal.emit(decoder.decode(bytes(out)))
+                elif total > shown:
+                    self.write(decoder.decode(bytes(out[max(0, shown - base):])))
+                shown = total
+                # restore() replaces the tape, so look it up again every time
+                self.live, self.live_ptr = m.tape, max(m.ptr, 0)
+                self.serve()
+                self.publish(force=not running)
+                if not running and where != (history.position(), history.steps):
+                    where = (history.position(), history.steps)
+                    self.position_signal.emit(*where)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            self.done_signal.emit()
+
 class Main(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -67,16 +324,18 @@ class Main(QMainWindow):
         mono.setPointSize(12)
 
         # Editor & Output
-        self.editor = QPlainTextEdit()
+        self.editor = CodeEditor()
         self.editor.setFont(mono)
-        self.output = QTextEdit(); self.output.setReadOnly(True); self.output.setFont(mono)
+        self.output = Console(max_lines=10000, max_bytes=1 << 20); self.output.setFont(mono)
+        self.stdin_edit = QPlainTextEdit(); self.stdin_edit.setFont(mono)
+        self.stdin_edit.setPlaceholderText("Program input (read by ',')")
 
         # Apply dark styles
         self.setStyleSheet(f"""
             QMainWindow {{ background: {C_BG}; color: {C_TEXT}; }}
             QToolBar {{ background: #252526; border:0; padding:6px; }}
             QPlainTextEdit {{ background: #1e1e1e; color: #d4d4d4; border: 1px solid #3c3c3c; }}
-            QTextEdit {{ background: #1e1e1e; color: #b5cea8; border: 1px solid #3c3c3c; }}
+            Console {{ background: #1e1e1e; color: #d7ba7d; border: 1px solid #3c3c3c; }}
             QLabel {{ color: #cccccc; }}
             QPushButton {{ background: #0e639c; color: white; border: none; padding: 6px 10px; }}
             QPushButton:hover {{ background: #1177bb; }}
@@ -84,19 +343,21 @@ class Main(QMainWindow):
         """)
 
         # Highlighters
-        self.py_highlighter = PyHighlighter(self.editor.document())
+        self.py_highlighter = PyHighlighter(self.editor.document(), self.editor)
         self.bf_highlighter = None  # created when toggled
 
         # Tape & Render
-        self.tape = [0]*4096
-        self.tape_view = TapeView(self.tape)
+        self.tape_view = TapeView()
+        self.tape_view.window_changed.connect(self.on_tape_window)
+        self.tape_view.find_requested.connect(self.on_tape_find)
+        self.tape_window = (0, 1024)
         self.render_win = RenderWindow(16,16)
 
         # Toolbar
         tb = QToolBar("Main"); self.addToolBar(tb)
 
         self.combo_dialect = QComboBox()
-        dialects = [f[:-3] for f in os.listdir(MODULE_DIR) if f.endswith(".py") and not f.startswith("__")]
+        dialects = ["auto"] + list_plugins(MODULE_DIR)
         for d in dialects: self.combo_dialect.addItem(d)
 
         # Mode selector
@@ -104,16 +365,30 @@ class Main(QMainWindow):
         self.combo_mode.addItems(["Python", "BF"])
         self.combo_mode.currentTextChanged.connect(self.on_mode_change)
 
+        # where the engine runs: a child process (default) or a thread of the IDE
+        self.combo_backend = QComboBox()
+        self.combo_backend.addItems(["process", "thread", "time travel"])
+        # checkpoint memory for "time travel" runs; over it, checkpoints get sparser
+        self.spin_history = QSpinBox(); self.spin_history.setRange(16, 1 << 16); self.spin_history.setValue(256)
+        self.spin_history.setSuffix(" MB")
+
         act_run = QAction("Run", self); act_run.setShortcut("F5")
+        act_profile = QAction("Profile", self)
         act_pause = QAction("Pause", self); act_step = QAction("Step", self); act_cont = QAction("Continue", self)
+        act_stop = QAction("Stop", self); act_stop.setShortcut("Shift+F5")
+        act_back = QAction("Back", self); act_back.setShortcut("Shift+F11")
+        act_back_write = QAction("Back to write…", self)
         act_open = QAction("Open", self); act_save = QAction("Save", self)
         act_render = QAction("Render Window", self)
 
-        tb.addAction(act_run); tb.addAction(act_pause); tb.addAction(act_step); tb.addAction(act_cont)
+        tb.addAction(act_run); tb.addAction(act_profile); tb.addAction(act_pause); tb.addAction(act_step); tb.addAction(act_cont); tb.addAction(act_stop)
+        tb.addAction(act_back); tb.addAction(act_back_write)
         tb.addSeparator()
         tb.addWidget(QLabel("Mode:")); tb.addWidget(self.combo_mode)
         tb.addSeparator()
         tb.addWidget(QLabel("Dialect:")); tb.addWidget(self.combo_dialect)
+        tb.addWidget(QLabel("Run in:")); tb.addWidget(self.combo_backend)
+        tb.addWidget(QLabel("History:")); tb.addWidget(self.spin_history)
         tb.addSeparator()
         tb.addAction(act_open); tb.addAction(act_save); tb.addAction(act_render)
 
@@ -121,16 +396,23 @@ class Main(QMainWindow):
         splitter = QSplitter(Qt.Orientation.Vertical)
         top = QWidget(); top_l = QVBoxLayout(top)
         top_l.addWidget(self.editor); top_l.addWidget(self.tape_view)
-        splitter.addWidget(top); splitter.addWidget(self.output)
+        bottom = QSplitter(Qt.Orientation.Horizontal)
+        bottom.addWidget(self.output); bottom.addWidget(self.stdin_edit)
+        bottom.setStretchFactor(0, 3); bottom.setStretchFactor(1, 1)
+        splitter.addWidget(top); splitter.addWidget(bottom)
         splitter.setStretchFactor(0, 3); splitter.setStretchFactor(1, 1)
         central = QWidget(); lay = QVBoxLayout(central); lay.addWidget(splitter); self.setCentralWidget(central)
         self.setStatusBar(QStatusBar())
 
         # Signals
         act_run.triggered.connect(self.run_code)
+        act_profile.triggered.connect(self.profile_code)
         act_pause.triggered.connect(self.pause_code)
         act_step.triggered.connect(self.step_code)
         act_cont.triggered.connect(self.continue_code)
+        act_stop.triggered.connect(self.stop_code)
+        act_back.triggered.connect(self.back_code)
+        act_back_write.triggered.connect(self.back_to_write)
         act_open.triggered.connect(self.open_file)
         act_save.triggered.connect(self.save_file)
         act_render.triggered.connect(lambda: self.render_win.show())
@@ -147,70 +429,146 @@ class Main(QMainWindow):
         if txt == "Python":
             # switch to Python highlighter
             if self.bf_highlighter:
-                self.bf_highlighter.setDocument(None)
+                self.bf_highlighter.detach()
                 self.bf_highlighter = None
-            self.py_highlighter = PyHighlighter(self.editor.document())
+            self.py_highlighter = PyHighlighter(self.editor.document(), self.editor)
         else:
             # BF mode
             if self.py_highlighter:
-                self.py_highlighter.setDocument(None)
+                self.py_highlighter.detach()
                 self.py_highlighter = None
             from .highlighter import BFHighlighter
-            self.bf_highlighter = BFHighlighter(self.editor.document())
+            self.bf_highlighter = BFHighlighter(self.editor.document(), self.editor)
 
     def append_output(self, text, error=False):
-        color = "#d7ba7d" if not error else "#f44747"
-        self.output.append(f"<span style='color:{color}'>{text}</span>")
+        if error:
+            self.output.drain()  # keep errors after the output that preceded them
+            self.output.append_error(text)
+        else:
+            self.output.write(text)
 
-    def run_code(self):
+    def run_code(self, _checked=False, profile=None):
         # Resolve source: Python->BF or raw BF
         src = self.editor.toPlainText()
         bf_code = src
         if self.mode == "Python":
             try:
                 conv = load_plugin(STUMOD_DIR, "py2bf")
-                bf_code = conv.py_to_bf(src)
+                cache = load_plugin(MODULE_DIR, "_cache")
+                # key on the converter's own source too, so editing py2bf never serves stale BF
+                with open(conv.__file__, "rb") as f:
+                    stamp = hashlib.sha1(f.read()).hexdigest()
+                bf_code = cache.lookup("py2bf", src, (stamp,), lambda: conv.py_to_bf(src))
             except Exception as e:
                 QMessageBox.critical(self, "Conversion error", str(e))
                 return
 
+        self.close_runner()
         self.output.clear()
         self.pause_event.clear()
         self.step_once_event.clear()
         dialect = self.combo_dialect.currentText()
 
-        self.runner = Runner(dialect, bf_code, self.pause_event, self.step_once_event)
-        self.runner.output_signal.connect(lambda t: self.append_output(t))
+        # breakpoints are source offsets, so they only apply when the editor holds the BF itself
+        bps = self.editor.breakpoint_offsets() if self.mode == "BF" else ()
+        stdin = self.stdin_edit.toPlainText().encode("utf-8")
+        if self.bf_highlighter:
+            self.bf_highlighter.set_heat(None)
+        backend = self.combo_backend.currentText()
+        cls = {"process": ProcessRunner, "time travel": HistoryRunner}.get(backend, Runner)
+        extra = {"budget": self.spin_history.value() << 20} if cls is HistoryRunner else {}
+        self.runner = cls(dialect, bf_code, self.pause_event, self.step_once_event, bps, stdin, self.output.write, profile,
+                             self.render_win.framebuffer(), self.render_win.post, self.tape_window, **extra)
+        if cls is HistoryRunner:
+            self.runner.rewind_signal.connect(self.on_rewind)
+            self.runner.position_signal.connect(self.on_position)
+        if profile:
+            self.runner.done_signal.connect(lambda: self.on_profile_done(profile))
+        self.runner.break_signal.connect(self.on_break)
         self.runner.error_signal.connect(lambda e: self.append_output(e, True))
-        self.runner.update_tape.connect(self.on_tape_update)
-        self.runner.update_render.connect(self.on_render_update)
+        self.runner.update_tape.connect(self.tape_view.apply)
+        self.runner.found_signal.connect(self.tape_view.found)
+        self.render_win.watch(self.runner.frame if cls is ProcessRunner else None)
         self.runner.start()
         self.statusBar().showMessage("Running…", 2000)
 
+    def profile_code(self):
+        self.run_code(profile=load_plugin(MODULE_DIR, "_profile").Profile())
+
+    def on_profile_done(self, profile):
+        # the heat map needs source offsets, so it only applies when the editor holds the BF itself
+        if self.bf_highlighter:
+            self.bf_highlighter.set_heat(profile.counts())
+        self.output.drain()
+        self.output.appendPlainText("\n" + profile.report(10))
+        self.statusBar().showMessage("Profile ready", 3000)
+
     def pause_code(self):
         if self.runner:
-            self.pause_event.set()
+            self.runner.pause()
             self.statusBar().showMessage("Paused", 1500)
 
     def step_code(self):
         if self.runner:
             # ensure paused, then release one step
-            self.pause_event.set()
-            self.step_once_event.set()
+            self.runner.step()
             self.statusBar().showMessage("Stepped", 800)
 
     def continue_code(self):
         if self.runner:
-            self.pause_event.clear()
+            self.runner.resume()
             self.statusBar().showMessage("Continuing…", 1500)
 
-    def on_tape_update(self, tape, ptr):
-        n = min(len(tape), len(self.tape))
-        self.tape[:n] = tape[:n]
-        self.tape_view.update_state(self.tape, ptr)
+    def stop_code(self):
+        if self.runner and self.runner.isRunning():
+            self.runner.stop()
+            self.statusBar().showMessage("Stopped", 1500)
 
-    def on_render_update(self, buf, w, h):
-        self.render_win.update_buffer(buf, w, h)
+    def back_code(self):
+        if isinstance(self.runner, HistoryRunner) and self.runner.isRunning():
+            self.runner.back()
+        else:
+            self.statusBar().showMessage("Going back needs Run in: time travel", 3000)
+
+    def back_to_write(self):
+        if not (isinstance(self.runner, HistoryRunner) and self.runner.isRunning()):
+            self.statusBar().showMessage("Going back needs Run in: time travel", 3000)
+            return
+        cell, ok = QInputDialog.getInt(self, "Back to write", "Cell:", 0, 0, 1 << 30)
+        if ok:
+            self.runner.back_to_write(cell)
+
+    def on_rewind(self, text):
+        self.output.clear()
+        self.output.write(text)
+
+    def on_position(self, pos, steps):
+        self.editor.show_position(pos)
+        self.statusBar().showMessage(f"Stopped after {steps:,} instructions")
+
+    def close_runner(self):
+        if self.runner:
+            self.render_win.watch(None)
+            self.runner.stop()
+            self.runner.close()
+            self.runner = None
+
+    def closeEvent(self, ev):
+        self.close_runner()
+        super().closeEvent(ev)
+
+    def on_break(self, pos):
+        self.editor.show_position(pos)
+        self.statusBar().showMessage(f"Breakpoint at offset {pos} — Step or Continue", 3000)
+
+    def on_tape_window(self, start, count):
+        self.tape_window = (start, count)
+        if self.runner:
+            self.runner.set_window(start, count)
+
+    def on_tape_find(self, value, start):
+        if self.runner:
+            self.runner.find(value, start)
 
     def open_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Open", "", "Python (*.py);;Brainfuck (*.bf *.txt);;All files (*)")
@@ -1,30 +1,104 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QSpinBox, QComboBox, QLabel
+from PyQt6.QtGui import QPainter, QImage
+from PyQt6.QtCore import Qt, QTimer, QRectF
 
-from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor
-from PyQt6.QtCore import Qt
+from Studio import MODULE_DIR, load_plugin
+
+class Canvas(QWidget):
+    """Blits the current frame as one scaled QImage, keeping the aspect ratio."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+
+    def paintEvent(self, ev):
+        p = QPainter(self)
+        p.fillRect(self.rect(), Qt.GlobalColor.black)
+        if self.image is not None:
+            iw, ih = self.image.width(), self.image.height()
+            scale = min(self.width() / iw, self.height() / ih)
+            w, h = iw * scale, ih * scale
+            p.drawImage(QRectF((self.width() - w) / 2, (self.height() - h) / 2, w, h), self.image)
+        p.end()
 
 class RenderWindow(QWidget):
+    """Render window: framebuffer settings plus a canvas.
+    post() may be called from the engine thread; it only stores the latest frame, and a
+    timer running at the display refresh rate turns it into an image, so a program that
+    renders faster than the screen never queues up repaints. With watch(), the timer instead
+    reads frames where they already are (shared memory of an engine process).
+    """
     def __init__(self, width=16, height=16):
         super().__init__()
-        self.width_px, self.height_px = width, height
+        self.render = load_plugin(MODULE_DIR, "_render")
         self.setWindowTitle("BF Render Window")
-        self.resize(width*20, height*20)
-        self.buffer = [0]*(width*height)
+        self.resize(512, 560)
+
+        self.spin_w = QSpinBox(); self.spin_w.setRange(1, 1024); self.spin_w.setValue(width)
+        self.spin_h = QSpinBox(); self.spin_h.setRange(1, 1024); self.spin_h.setValue(height)
+        self.spin_base = QSpinBox(); self.spin_base.setRange(0, 1 << 24); self.spin_base.setValue(self.render.Framebuffer().base)
+        self.combo_palette = QComboBox(); self.combo_palette.addItems(self.render.PALETTES)
+        self.combo_palette.currentTextChanged.connect(self.set_palette)
+        bar = QHBoxLayout()
+        for label, w in (("W", self.spin_w), ("H", self.spin_h), ("Base", self.spin_base), ("Palette", self.combo_palette)):
+            bar.addWidget(QLabel(label)); bar.addWidget(w)
+        bar.addStretch()
+        self.canvas = Canvas()
+        lay = QVBoxLayout(self); lay.addLayout(bar); lay.addWidget(self.canvas, 1)
+
+        self.colors = self.render.color_table()
+        self.pending = None      # newest (bytes, w, h); replaced wholesale, so no lock is needed
+        self.shown = None
+        self.source = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(16)
+
+    def showEvent(self, ev):
+        # coalesce to the screen's refresh rate
+        hz = self.screen().refreshRate() if self.screen() else 60
+        self.timer.setInterval(max(4, int(1000 / (hz or 60))))
+        super().showEvent(ev)
+
+    def framebuffer(self):
+        """Geometry for the next run (a _render.Framebuffer)."""
+        palette = self.combo_palette.currentText()
+        return self.render.framebuffer({"width": self.spin_w.value(), "height": self.spin_h.value(),
+                                        "base": self.spin_base.value(),
+                                        "palette": None if palette == "gray" else palette})
+
+    def set_palette(self, palette):
+        self.colors = self.render.color_table(None if palette == "gray" else palette)
+        self.shown = None   # redraw the current frame with the new colors
+
+    def post(self, buf, w, h):
+        """Thread-safe: queue a frame (bytes of w*h pixels); only the newest one is drawn."""
+        self.pending = (buf, w, h)
+
+    def watch(self, source):
+        """Take frames from source() -> (frame number, pixels, w, h) or None on every refresh
+        instead of from post(); None goes back to post()."""
+        self.source, self.shown = source, None
 
     def update_buffer(self, buf, w=None, h=None):
-        if w and h and w*h == len(buf):
-            self.width_px, self.height_px = w, h
-        self.buffer = list(buf)
-        self.update()
+        self.post(bytes(buf), w or self.spin_w.value(), h or self.spin_h.value())
 
-    def paintEvent(self, ev):
-        p = QPainter(self)
-        cw = max(6, self.width() // self.width_px)
-        ch = max(6, self.height() // self.height_px)
-        for y in range(self.height_px):
-            for x in range(self.width_px):
-                v = self.buffer[y*self.width_px + x] & 0xFF
-                p.setBrush(QColor(v, v, v))
-                p.setPen(Qt.PenStyle.NoPen)
-                p.drawRect(x*cw, y*ch, cw, ch)
-        p.end()
+    def refresh(self):
+        if not self.isVisible():
+            return
+        if self.source:
+            frame = self.source()
+            if frame is None or frame[0] == self.shown:
+                return
+            self.shown, buf, w, h = frame
+        else:
+            frame = self.pending
+            if frame is None or frame is self.shown:
+                return
+            self.shown = frame
+            buf, w, h = frame
+        if w * h != len(buf):
+            return
+        img = QImage(bytes(buf), w, h, w, QImage.Format.Format_Indexed8)
+        img.setColorTable(self.colors)
+        self.canvas.image = img.copy()   # detach from buf
+        self.canvas.update()
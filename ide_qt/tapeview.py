@@ -1,31 +1,216 @@
+from PyQt6.QtWidgets import (QWidget, QAbstractScrollArea, QHBoxLayout, QVBoxLayout, QComboBox,
+                             QLineEdit, QPushButton, QCheckBox, QLabel)
+from PyQt6.QtGui import QPainter, QPen, QColor, QFontMetrics
+from PyQt6.QtCore import Qt, QRect, pyqtSignal
 
-from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QPen, QColor
-from PyQt6.QtCore import Qt
+COLS = 16          # cells per row
+PREFETCH = 4       # extra rows fetched above and below the visible ones
 
-class TapeView(QWidget):
-    def __init__(self, tape, pointer=0, parent=None):
+class TapeGrid(QAbstractScrollArea):
+    """Hex-editor style grid over a tape of any length. Only the cells around the visible rows
+    are held (self.cells from self.base); scrolling asks for a new window through
+    window_changed, and changed cells repaint only their own rectangles.
+    """
+    window_changed = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.tape = tape
-        self.pointer = pointer
-        self.cell_size = 16
-        self.visible = 64
-        self.setMinimumHeight(self.cell_size + 10)
-
-    def update_state(self, tape, pointer):
-        self.tape = tape
-        self.pointer = pointer
-        self.update()
-
-    def paintEvent(self, e):
-        p = QPainter(self)
-        w = self.cell_size
-        start = max(0, self.pointer - self.visible//2)
-        for i in range(self.visible):
-            idx = start + i
-            val = self.tape[idx] if idx < len(self.tape) else 0
-            g = min(255, val)
-            p.setBrush(QColor(30, 80 + g//2, 60))
-            p.setPen(QPen(Qt.GlobalColor.yellow if idx == self.pointer else Qt.GlobalColor.black, 2 if idx == self.pointer else 1))
-            p.drawRect(i*w+2, 2, w-4, self.cell_size-4)
+        self.length = 30000
+        self.pointer = 0
+        self.base = 0
+        self.cells = []
+        self.mode = "dec"
+        self.mark = -1             # last search hit
+        self.follow = True
+        self.window = None
+        fm = QFontMetrics(self.font())
+        self.row_h = fm.height() + 4
+        self.addr_w = fm.horizontalAdvance("00000000") + 10
+        self.cell_w = fm.horizontalAdvance("0000") + 8
+        self.setMinimumHeight(self.row_h * 4)
+        self.verticalScrollBar().valueChanged.connect(self.request_window)
+        self.update_range()
+
+    def rows_visible(self):
+        return max(1, self.viewport().height() // self.row_h)
+
+    def update_range(self):
+        rows = (self.length + COLS - 1) // COLS
+        sb = self.verticalScrollBar()
+        sb.setRange(0, max(0, rows - self.rows_visible()))
+        sb.setPageStep(self.rows_visible())
+
+    def resizeEvent(self, ev):
+        super().resizeEvent(ev)
+        self.update_range()
+        self.request_window()
+
+    def request_window(self, *_):
+        first = max(0, self.verticalScrollBar().value() - PREFETCH)
+        window = (first * COLS, (self.rows_visible() + 2 * PREFETCH) * COLS)
+        if window != self.window:
+            self.window = window
+            self.window_changed.emit(*window)
+        self.viewport().update()
+
+    def value(self, idx):
+        i = idx - self.base
+        return self.cells[i] if 0 <= i < len(self.cells) else None
+
+    def text(self, v):
+        if v is None: return "·"
+        if self.mode == "hex": return f"{v:02X}"
+        if self.mode == "char": return chr(v) if 32 <= v < 127 else "·"
+        return str(v)
+
+    def cell_rect(self, idx):
+        row = idx // COLS - self.verticalScrollBar().value()
+        return QRect(self.addr_w + (idx % COLS) * self.cell_w, row * self.row_h, self.cell_w, self.row_h)
+
+    def repaint_cells(self, start, end):
+        """Schedule a repaint of cells [start, end) that are on screen."""
+        top = self.verticalScrollBar().value() * COLS
+        start, end = max(start, top), min(end, top + self.rows_visible() * COLS + COLS)
+        if start >= end:
+            return
+        if start // COLS == (end - 1) // COLS:
+            self.viewport().update(self.cell_rect(start).united(self.cell_rect(end - 1)))
+        else:
+            r0, r1 = self.cell_rect(start), self.cell_rect(end - 1)
+            self.viewport().update(QRect(self.addr_w, r0.top(), COLS * self.cell_w, r1.bottom() - r0.top() + 1))
+
+    def apply(self, base, diffs, pointer, length):
+        """New data from the engine for the window starting at base."""
+        if base != self.base:
+            self.base, self.cells = base, []
+            self.viewport().update()
+        for start, data in diffs:
+            i = start - base
+            if i > len(self.cells):
+                self.cells.extend([0] * (i - len(self.cells)))
+            self.cells[i:i + len(data)] = list(data)
+            self.repaint_cells(start, start + len(data))
+        if length != self.length:
+            self.length = length
+            self.update_range()
+        if pointer != self.pointer:
+            old, self.pointer = self.pointer, pointer
+            self.repaint_cells(old, old + 1)
+            self.repaint_cells(pointer, pointer + 1)
+            if self.follow:
+                self.ensure_visible(pointer)
+
+    def ensure_visible(self, idx):
+        sb, row = self.verticalScrollBar(), idx // COLS
+        if not sb.value() <= row < sb.value() + self.rows_visible():
+            sb.setValue(max(0, row - self.rows_visible() // 2))
+
+    def jump(self, idx, mark=False):
+        if mark:
+            old, self.mark = self.mark, idx
+            self.repaint_cells(old, old + 1)
+            self.repaint_cells(idx, idx + 1)
+        self.ensure_visible(idx)
+
+    def paintEvent(self, ev):
+        p = QPainter(self.viewport())
+        clip = ev.rect()
+        first_row = self.verticalScrollBar().value()
+        for r in range(clip.top() // self.row_h, clip.bottom() // self.row_h + 1):
+            row = first_row + r
+            if row * COLS >= self.length:
+                break
+            y = r * self.row_h
+            p.setPen(QColor("#858585"))
+            p.drawText(QRect(0, y, self.addr_w - 6, self.row_h), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, str(row * COLS))
+            for c in range(COLS):
+                idx = row * COLS + c
+                if idx >= self.length:
+                    break
+                rect = self.cell_rect(idx)
+                if not rect.intersects(clip):
+                    continue
+                v = self.value(idx)
+                g = min(255, v or 0)
+                p.fillRect(rect.adjusted(1, 1, -1, -1), QColor(30, 50 + g // 3, 60) if g else QColor("#252526"))
+                if idx == self.pointer or idx == self.mark:
+                    p.setPen(QPen(QColor("#ffd700") if idx == self.pointer else QColor("#4fc1ff"), 2))
+                    p.drawRect(rect.adjusted(1, 1, -2, -2))
+                p.setPen(QColor("#d4d4d4") if v else QColor("#6a6a6a"))
+                p.drawText(rect, Qt.AlignmentFlag.AlignCenter, self.text(v))
         p.end()
+
+class TapeView(QWidget):
+    """Tape inspector: display mode, jump-to-address and search above a TapeGrid.
+    window_changed(start, count) and find_requested(value, start) go to the running engine;
+    its answers come back through apply() and found().
+    """
+    window_changed = pyqtSignal(int, int)
+    find_requested = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.grid = TapeGrid()
+        self.grid.window_changed.connect(self.window_changed)
+
+        self.combo_mode = QComboBox(); self.combo_mode.addItems(["dec", "hex", "char"])
+        self.combo_mode.currentTextChanged.connect(self.set_mode)
+        self.edit_goto = QLineEdit(); self.edit_goto.setPlaceholderText("address")
+        self.edit_goto.returnPressed.connect(self.goto)
+        self.edit_find = QLineEdit(); self.edit_find.setPlaceholderText("value, 0x.. or 'c'")
+        self.edit_find.returnPressed.connect(self.find_next)
+        btn_find = QPushButton("Find next"); btn_find.clicked.connect(self.find_next)
+        self.check_follow = QCheckBox("Follow pointer"); self.check_follow.setChecked(True)
+        self.check_follow.toggled.connect(self.set_follow)
+        self.found_label = QLabel()
+        self.status = QLabel()
+
+        bar = QHBoxLayout()
+        for w in (self.combo_mode, QLabel("Go to"), self.edit_goto, QLabel("Find"), self.edit_find, btn_find,
+                  self.found_label, self.check_follow, self.status):
+            bar.addWidget(w)
+        bar.addStretch()
+        lay = QVBoxLayout(self); lay.setContentsMargins(0, 0, 0, 0)
+        lay.addLayout(bar); lay.addWidget(self.grid, 1)
+
+    def set_mode(self, mode):
+        self.grid.mode = mode
+        self.grid.viewport().update()
+
+    def set_follow(self, on):
+        self.grid.follow = on
+        if on: self.grid.ensure_visible(self.grid.pointer)
+
+    @staticmethod
+    def parse(text):
+        text = text.strip()
+        if len(text) == 3 and text[0] == text[2] == "'":
+            return ord(text[1])
+        return int(text, 0)
+
+    def goto(self):
+        try:
+            idx = self.parse(self.edit_goto.text())
+        except ValueError:
+            return
+        self.check_follow.setChecked(False)
+        self.grid.jump(min(max(idx, 0), self.grid.length - 1), mark=True)
+
+    def find_next(self):
+        try:
+            value = self.parse(self.edit_find.text())
+        except ValueError:
+            return
+        self.find_requested.emit(value, self.grid.mark + 1)
+
+    def found(self, idx):
+        if idx < 0:
+            self.found_label.setText("not found")
+            return
+        self.found_label.setText(f"at {idx}")
+        self.check_follow.setChecked(False)
+        self.grid.jump(idx, mark=True)
+
+    def apply(self, base, diffs, pointer, length):
+        self.grid.apply(base, diffs, pointer, length)
+        self.status.setText(f"ptr {pointer} / {length} cells")
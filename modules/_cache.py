@@ -0,0 +1,120 @@
+"""Compiled-program cache: an in-memory LRU backed by an on-disk cache directory.
+
+Entries are keyed by a hash of (kind, source, params) — e.g. ("optimized", code, (level,)).
+On disk each entry is one file:
+    MAGIC | u16 CACHE_VERSION | u16 len(tag) | tag | marshal payload
+where tag is the interpreter's cache tag, since marshal (and code objects) are only
+readable by the Python version that wrote them. Unreadable or stale files are ignored
+and rebuilt. Bump CACHE_VERSION whenever a builder's output format changes.
+
+BFSTUDIO_CACHE=<dir> moves the disk cache, BFSTUDIO_CACHE=off disables it.
+"""
+import hashlib, marshal, os, struct, sys, tempfile
+from collections import OrderedDict
+
+CACHE_VERSION = 3
+MAGIC = b"BFSC"
+DISK_MIN = 4096    # sources smaller than this rebuild faster than a disk round-trip
+TAG = (sys.implementation.cache_tag or sys.implementation.name).encode()
+
+def default_dir():
+    env = os.environ.get("BFSTUDIO_CACHE")
+    if env:
+        return None if env.lower() == "off" else env
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "bfstudiox")
+
+class ProgramCache:
+    def __init__(self, directory=None, capacity=64):
+        self.directory = directory
+        self.capacity = capacity
+        self.mem = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(kind, source, params=()):
+        h = hashlib.sha256()
+        h.update(f"{CACHE_VERSION}\0{kind}\0{params!r}\0".encode())
+        h.update(source.encode("utf-8", "surrogatepass") if isinstance(source, str) else source)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:] + ".bfc")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        head = len(MAGIC) + 4
+        if data[:len(MAGIC)] != MAGIC or len(data) < head:
+            return None
+        version, taglen = struct.unpack("<HH", data[len(MAGIC):head])
+        if version != CACHE_VERSION or data[head:head+taglen] != TAG:
+            return None
+        try:
+            return marshal.loads(data[head+taglen:])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def _store(self, key, value):
+        path = self._path(key)
+        try:
+            payload = marshal.dumps(value)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + struct.pack("<HH", CACHE_VERSION, len(TAG)) + TAG + payload)
+            os.replace(tmp, path)
+        except (OSError, ValueError):
+            pass  # the cache is best-effort
+
+    def _remember(self, key, value):
+        self.mem[key] = value
+        self.mem.move_to_end(key)
+        while len(self.mem) > self.capacity:
+            self.mem.popitem(last=False)
+
+    def get_or_build(self, kind, source, params, build, disk_min=DISK_MIN):
+        """Return the cached artifact for (kind, source, params), calling build() on a miss.
+        build() must return something marshal can serialize. Sources shorter than disk_min
+        stay in memory; artifacts that cost more to build than their source suggests (like
+        _prefix evaluations) pass disk_min=0.
+        """
+        key = self.key(kind, source, params)
+        if key in self.mem:
+            self.hits += 1
+            self.mem.move_to_end(key)
+            return self.mem[key]
+        disk = self.directory is not None and len(source) >= disk_min
+        value = self._load(key) if disk else None
+        if value is None:
+            self.misses += 1
+            value = build()
+            if disk:
+                self._store(key, value)
+        else:
+            self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def clear(self, disk=False):
+        self.mem.clear()
+        if disk and self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for f in files:
+                    if f.endswith(".bfc"):
+                        os.remove(os.path.join(root, f))
+
+_default = None
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = ProgramCache(default_dir())
+    return _default
+
+def lookup(kind, source, params, build, disk_min=DISK_MIN):
+    """get_or_build on the process-wide cache."""
+    return default_cache().get_or_build(kind, source, params, build, disk_min)
@@ -0,0 +1,180 @@
+"""Time-travel debugging: a Machine run that can go backwards.
+
+History runs a _machine.Machine forward and checkpoints it every `interval` instructions.
+A checkpoint is the registers plus the tape as PAGE-cell pages, and pages that haven't
+changed since the previous checkpoint are shared with it, so a checkpoint mostly costs the
+pages written in between. Going back restores the nearest checkpoint at or before the
+target and replays forward; replay is deterministic because the whole input is recorded
+up front and a checkpoint remembers how much of it had been read.
+
+Checkpoint memory is bounded by `budget` bytes: when it is exceeded, every other checkpoint
+is dropped and the interval doubles, so a run of hundreds of millions of instructions
+keeps a fixed number of checkpoints spread over its whole length (going back then replays
+further). Output is part of the history too: `output` holds what the program has printed up
+to the current instruction, and counts against the same budget. Past budget // OUTPUT_SHARE
+bytes its oldest half is dropped, so `output` then starts `trimmed` bytes into the real output.
+"""
+from array import array
+from collections import namedtuple
+from _machine import Machine
+
+PAGE = 4096                 # cells per checkpoint page
+INTERVAL = 1 << 16          # instructions between checkpoints, before any thinning
+BUDGET = 256 << 20          # bytes of checkpoint pages
+OVERHEAD = 256              # bytes counted per checkpoint besides its pages
+OUTPUT_SHARE = 8            # output kept: at most budget // OUTPUT_SHARE bytes, the newest
+
+Checkpoint = namedtuple("Checkpoint", "steps ip ptr consumed output pages")
+
+class History:
+    def __init__(self, code, input=b"", eof=0, cell_bits=8, level=2, interval=INTERVAL, budget=BUDGET):
+        self.machine = Machine(code, input, eof, cell_bits, level=level)
+        self.input = bytes(self.machine.input)
+        self.interval, self.budget = interval, budget
+        self.output = bytearray()
+        self.record = bytearray()   # output up to the furthest point reached, for restoring ahead
+        self.trimmed = 0            # bytes of output dropped from the front of both
+        self.skip = 0               # replayed output still inside the dropped part
+        self.checkpoints = []
+        self.memory = 0
+        self.checkpoint()
+
+    @property
+    def steps(self):
+        return self.machine.steps
+
+    @property
+    def done(self):
+        return self.machine.done
+
+    def position(self):
+        """Source offset of the next instruction (len(code) once done)."""
+        m = self.machine
+        return m.prog.pos[m.ip] if m.ip < len(m.prog.pos) else len(m.code)
+
+    def checkpoint(self):
+        m = self.machine
+        prev = self.checkpoints[-1].pages if self.checkpoints else ()
+        pages, added = [], 0
+        for i, lo in enumerate(range(0, len(m.tape), PAGE)):
+            data = m.tape[lo:lo + PAGE]
+            data = data.tobytes() if isinstance(data, array) else bytes(data)
+            if i < len(prev) and prev[i] == data:
+                data = prev[i]      # share the unchanged page
+            else:
+                added += len(data)
+            pages.append(data)
+        self.checkpoints.append(Checkpoint(m.steps, m.ip, m.ptr, m.consumed, self.trimmed + len(self.output),
+                                           tuple(pages)))
+        self.memory += added + OVERHEAD
+        if self.memory + len(self.output) + len(self.record) > self.budget and len(self.checkpoints) > 2:
+            self.thin()
+
+    def thin(self):
+        """Drop every other checkpoint (keeping the first and the newest) and double the interval."""
+        cps = self.checkpoints
+        self.checkpoints = cps[:-1:2] + [cps[-1]]
+        self.interval *= 2
+        seen = {}
+        for cp in self.checkpoints:
+            for p in cp.pages:
+                seen[id(p)] = len(p)
+        self.memory = sum(seen.values()) + OVERHEAD * len(self.checkpoints)
+
+    def restore(self, cp):
+        m = self.machine
+        raw = b"".join(cp.pages)
+        if isinstance(m.tape, array):
+            m.tape = array(m.tape.typecode, raw)
+        else:
+            m.tape = bytearray(raw)
+        m.steps, m.ip, m.ptr, m.consumed = cp.steps, cp.ip, cp.ptr, cp.consumed
+        m.input, m.input_pos = bytearray(self.input), cp.consumed
+        m.output.clear()
+        m.done = m.ip >= len(m.prog.ops)
+        end = cp.output - self.trimmed
+        self.skip = max(0, -end)
+        end = max(0, end)
+        if end < len(self.output):
+            del self.output[end:]
+        else:
+            self.output += self.record[len(self.output):end]
+
+    def trim(self):
+        """Drop the oldest output, keeping the newest half of budget // OUTPUT_SHARE bytes."""
+        drop = min(len(self.record) - self.budget // OUTPUT_SHARE // 2, len(self.output))
+        if drop > 0:
+            del self.record[:drop]
+            del self.output[:drop]
+            self.trimmed += drop
+
+    def _advance(self, count, watch=-1, replay=False):
+        m = self.machine
+        trapped = m.trapped
+        if replay:
+            m.trapped = None   # breakpoints only stop forward() runs
+        try:
+            return m.run(count, watch)
+        finally:
+            m.trapped = trapped
+            out = m.take_output()
+            if self.skip:
+                cut = min(self.skip, len(out))
+                out, self.skip = out[cut:], self.skip - cut
+            self.output += out
+            if len(self.output) > len(self.record):
+                self.record += self.output[len(self.record):]
+                if len(self.record) > self.budget // OUTPUT_SHARE:
+                    self.trim()
+
+    def forward(self, count, watch=-1):
+        """Run up to count instructions, checkpointing on the way; stops early at the end,
+        at a breakpoint (machine.break_at) or after a write to cell watch (machine.wrote).
+        Returns the instructions executed."""
+        m, total = self.machine, 0
+        while total < count and not m.done:
+            nxt = self.checkpoints[-1].steps + self.interval
+            if m.steps >= nxt:
+                # back on ground that was already checkpointed: just replay
+                later = [cp.steps for cp in self.checkpoints if cp.steps > m.steps]
+                nxt = later[0] if later else m.steps + self.interval
+            ran = self._advance(min(count - total, nxt - m.steps), watch)
+            total += ran
+            if m.steps == nxt and m.steps > self.checkpoints[-1].steps:
+                self.checkpoint()
+            if not ran or m.break_at >= 0 or m.wrote:
+                break
+        return total
+
+    def seek(self, target):
+        """Go to the state after exactly `target` instructions (or the end, if sooner)."""
+        target = max(0, target)
+        cp = max((c for c in self.checkpoints if c.steps <= target), key=lambda c: c.steps)
+        if target < self.steps or cp.steps > self.steps:
+            self.restore(cp)
+        while self.steps < target and not self.done:
+            if not self._advance(target - self.steps, replay=True):
+                break
+
+    def back(self, count=1):
+        self.seek(self.steps - count)
+
+    def last_write(self, cell):
+        """Go back to just before the latest instruction that wrote `cell` and return its
+        step number, or None (staying put) if nothing before this point wrote it."""
+        end = self.steps
+        cps = sorted(c for c in self.checkpoints if c.steps < end)
+        for i in range(len(cps) - 1, -1, -1):
+            stop = cps[i + 1].steps if i + 1 < len(cps) else end
+            self.restore(cps[i])
+            hit = None
+            while self.steps < stop:
+                self._advance(stop - self.steps, cell, replay=True)
+                if not self.machine.wrote:
+                    break
+                hit = self.steps - 1
+            if hit is not None:
+                self.seek(hit)
+                return hit
+        self.seek(end)
+        return None
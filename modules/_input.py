@@ -0,0 +1,89 @@
+"""Buffered input for the ',' instruction.
+
+open_input(source, eof) accepts:
+  - None                     : sys.stdin (binary, read in chunks as data arrives)
+  - bytes / bytearray / str  : the input itself (str is UTF-8 encoded)
+  - os.PathLike              : a file, memory-mapped
+  - a binary file object     : read in chunks
+  - an iterable of bytes     : streamed chunk by chunk
+  - an InputStream           : used as is
+eof selects what ',' stores at end of input: 0, -1 (all bits set) or None (cell unchanged).
+before_fill is called before reading more from a live stream (engines pass their output
+flush, so prompts show up before the program blocks on stdin).
+"""
+import mmap, os, sys
+
+CHUNK = 1 << 16
+
+class InputStream:
+    def __init__(self, source=None, eof=0, chunk=CHUNK, before_fill=None):
+        if eof not in (0, -1, None):
+            raise ValueError(f"eof must be 0, -1 or None, not {eof!r}")
+        self.eof = eof
+        self.before_fill = before_fill
+        self.chunk = chunk
+        self.buf = b""
+        self.pos = 0
+        self.consumed = 0   # bytes handed out before the current buffer
+        self._read = None   # refill: () -> bytes, b"" at end
+        self._mm = None
+
+        if source is None:
+            stream = sys.stdin.buffer if hasattr(sys.stdin, "buffer") else sys.stdin
+            source = stream
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.buf = bytes(source)
+        elif isinstance(source, os.PathLike):
+            with open(source, "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.buf = self._mm
+        elif hasattr(source, "read"):
+            read = getattr(source, "read1", None) or source.read
+            self._read = lambda: read(self.chunk)
+        else:
+            it = iter(source)
+            self._read = lambda: next(it, b"")
+
+    def _fill(self):
+        if self._read is None:
+            return False
+        if self.before_fill:
+            self.before_fill()
+        try:
+            data = self._read()
+        except (OSError, ValueError):
+            data = b""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data:
+            self._read = None
+            return False
+        self.consumed += self.pos
+        self.buf, self.pos = data, 0
+        return True
+
+    def read(self):
+        """Next byte as an int; at end of input the eof value (None = leave the cell unchanged)."""
+        if self.pos >= len(self.buf) and not self._fill():
+            return self.eof
+        v = self.buf[self.pos]
+        self.pos += 1
+        return v
+
+    def tell(self):
+        """Number of bytes read so far."""
+        return self.consumed + self.pos
+
+    def close(self):
+        if self._mm is not None:
+            self.buf = b""
+            self._mm.close()
+            self._mm = None
+
+def open_input(source=None, eof=0, before_fill=None):
+    if isinstance(source, InputStream):
+        return source
+    return InputStream(source, eof, before_fill=before_fill)
@@ -0,0 +1,134 @@
+"""Lower BF source into a folded instruction list shared by the fast dialects.
+
+Opcodes (arg meaning):
+  ADD   n                  : cell += n
+  MOVE  n                  : ptr += n
+  SET   v                  : cell = v            ([-], [+] become SET 0)
+  SCAN  step               : move by step until cell == 0   ([>], [<<], ...)
+  MUL   ((off, k), ...)    : cell[ptr+off] += cell*k, then cell = 0
+  OUT   -                  : output cell
+  IN    -                  : read into cell
+  JZ    j                  : if cell == 0: jump past j
+  JNZ   j                  : if cell != 0: jump past j
+  BRK   -                  : debugger trap; never emitted by compile_ir, engines patch it
+                             over a copy of ops to mark breakpoints
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from _cache import lookup
+
+ADD, MOVE, SET, SCAN, MUL, OUT, IN, JZ, JNZ, BRK = range(10)
+NAMES = ("add", "move", "set", "scan", "mul", "out", "in", "jz", "jnz", "brk")
+
+# ops/args/pos are parallel lists; pos[i] is the source offset of op i
+Program = namedtuple("Program", "ops args pos")
+
+BF_CHARS = "><+-,.[]"
+
+def _fold_loop(body):
+    """Return (op, arg) for a bracket-free loop body, or None if it must stay a loop."""
+    if body in ("-", "+"):
+        return SET, 0
+    if body and set(body) == {">"}:
+        return SCAN, len(body)
+    if body and set(body) == {"<"}:
+        return SCAN, -len(body)
+    off = 0
+    delta = {}
+    for c in body:
+        if c == ">": off += 1
+        elif c == "<": off -= 1
+        elif c == "+": delta[off] = delta.get(off, 0) + 1
+        elif c == "-": delta[off] = delta.get(off, 0) - 1
+        else: return None
+    if off != 0 or delta.get(0) != -1:
+        return None
+    terms = tuple((o, k) for o, k in sorted(delta.items()) if o != 0 and k != 0)
+    return (MUL, terms) if terms else (SET, 0)
+
+def compile_ir(code: str, level=2) -> Program:
+    """Compile BF source to a Program.
+    level 0: one op per character
+    level 1: + run-length folding of +-<>
+    level 2: + clear, scan and multiply/copy loop folding
+    """
+    src = [(c, i) for i, c in enumerate(code) if c in BF_CHARS]
+    ops, args, pos = [], [], []
+    stack = []
+
+    def emit(op, arg, p):
+        ops.append(op); args.append(arg); pos.append(p)
+
+    i, n = 0, len(src)
+    while i < n:
+        c, p = src[i]
+        if c in "+-<>":
+            group = "+-" if c in "+-" else "<>"
+            k, j = 0, i
+            while j < n and src[j][0] in group and (level >= 1 or j == i):
+                k += 1 if src[j][0] in "+>" else -1
+                j += 1
+            i = j
+            if group == "+-":
+                if ops and ops[-1] == SET and level >= 2:
+                    args[-1] += k          # [-]+++ -> set 3
+                elif k:
+                    emit(ADD, k, p)
+            elif k:
+                emit(MOVE, k, p)
+            continue
+        if c == "[":
+            if level >= 2:
+                j = i + 1
+                while j < n and src[j][0] not in "[]":
+                    j += 1
+                if j < n and src[j][0] == "]":
+                    folded = _fold_loop("".join(s[0] for s in src[i+1:j]))
+                    if folded:
+                        emit(folded[0], folded[1], p)
+                        i = j + 1
+                        continue
+            stack.append(len(ops))
+            emit(JZ, None, p)
+        elif c == "]":
+            if not stack:
+                raise SyntaxError(f"Unmatched ']' at {p}")
+            j = stack.pop()
+            args[j] = len(ops)
+            emit(JNZ, j, p)
+        elif c == ".":
+            emit(OUT, None, p)
+        elif c == ",":
+            emit(IN, None, p)
+        i += 1
+    if stack:
+        raise SyntaxError(f"Unmatched '[' at {pos[stack[-1]]}")
+    return Program(ops, args, pos)
+
+def compile_cached(code: str, level=2) -> Program:
+    """compile_ir through the compiled-program cache."""
+    return Program(*lookup("ir", code, (level,), lambda: tuple(compile_ir(code, level))))
+
+def op_at(prog: Program, p):
+    """Index of the first op at or after source offset p (len(ops) if none)."""
+    return bisect_left(prog.pos, p)
+
+def op_for_break(prog: Program, code: str, p):
+    """Index of the op a breakpoint at source offset p stops before: the op whose source
+    contains p (so a character inside a folded loop or run maps to the folded op), else the
+    first op after p (len(ops) if none)."""
+    j = bisect_right(prog.pos, p) - 1
+    if j < 0 or p == prog.pos[j]:
+        return max(j, 0)
+    nxt = prog.pos[j + 1] if j + 1 < len(prog.pos) else len(code)
+    if not any(c in BF_CHARS for c in code[p:nxt]):
+        j += 1    # p is past op j's last character
+    return j
+
+def dump(prog: Program) -> str:
+    """Human-readable listing, one op per line."""
+    lines = []
+    for i, (op, arg, p) in enumerate(zip(*prog)):
+        a = "" if arg is None else f" {arg}"
+        lines.append(f"{i:6d} @{p:<6d} {NAMES[op]}{a}")
+    return "\n".join(lines)
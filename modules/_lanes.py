@@ -0,0 +1,165 @@
+"""Lane engine: one BF program over many inputs at once, vectorized with NumPy.
+
+    results = run(code, [b"abc", b"hello", ...])    # [Lane(status, output, steps, error), ...]
+
+Every input gets a lane: a row of a 2-D uint8 tape, with its ptr, ip, step count and input
+position in vectors. Each round executes one op of the folded IR (as `optimized` runs it)
+for every lane whose ip is the lowest among the unfinished lanes, as a few NumPy operations
+over those lanes; the others wait. Lanes that leave a loop early wait at its exit for the
+rest, so lanes that take the same path run in lockstep and share one dispatch per op.
+
+The tape grows to the right for all lanes as soon as one needs it. A lane that fails
+(pointer left of the tape, max_steps) stops with its own status while the others carry on;
+timeout covers the whole call. Input-free prefixes (_prefix) are evaluated once for all
+lanes. Cells are 8 bits. NumPy is only needed here, so it is imported here.
+"""
+import time
+from collections import namedtuple
+from _ir import compile_cached, op_at, ADD, MOVE, SET, SCAN, MUL, OUT, IN, JZ, JNZ
+from _prefix import cached as cached_prefix, OutOfTime, BUDGET as PREFIX_BUDGET
+try:
+    import numpy as np
+except ImportError:   # optional dependency
+    np = None
+
+CELLS = 256          # initial tape width per lane; doubles as needed
+CHECK_EVERY = 4096   # rounds between clock checks
+
+Lane = namedtuple("Lane", "status output steps error")
+
+def run(code, inputs, eof=0, max_steps=None, timeout=None, level=2, prefix=True):
+    """Run code once per input (bytes or str) and return a Lane per input, in order: status
+    "ok", "error", "step_limit" or "timeout" (as in batch mode), output bytes, IR ops executed
+    and the error message (None when ok). eof is what ',' stores at end of input, as for the
+    engines: 0, -1 or None (leave the cell unchanged)."""
+    if np is None:
+        raise RuntimeError("The lane engine needs NumPy (pip install numpy)")
+    if eof not in (0, -1, None):
+        raise ValueError(f"eof must be 0, -1 or None, not {eof!r}")
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    prog = compile_cached(code, level)
+    ops, args = prog.ops, prog.args
+    n, lanes = len(ops), len(inputs)
+
+    data = [s.encode("utf-8") if isinstance(s, str) else bytes(s) for s in inputs]
+    in_len = np.array([len(d) for d in data], np.int64)
+    in_buf = np.zeros((lanes, max(map(len, data), default=0) + 1), np.uint8)
+    for i, d in enumerate(data):
+        in_buf[i, :len(d)] = np.frombuffer(d, np.uint8)
+    in_pos = np.zeros(lanes, np.int64)
+
+    tape = np.zeros((lanes, CELLS), np.uint8)
+    ptr = np.zeros(lanes, np.int64)
+    ip = np.zeros(lanes, np.int64)      # finished lanes park at n
+    steps = np.zeros(lanes, np.int64)
+    out = np.zeros((lanes, 64), np.uint8)
+    out_len = np.zeros(lanes, np.int64)
+    status, errors = ["ok"] * lanes, [None] * lanes
+    head = b""
+
+    def widen(a, upto):
+        w = a.shape[1]
+        while w <= upto:
+            w *= 2
+        return np.concatenate([a, np.zeros((lanes, w - a.shape[1]), np.uint8)], axis=1)
+
+    start = None
+    if prefix and lanes:
+        try:
+            start = cached_prefix(code, level, 8, PREFIX_BUDGET if max_steps is None else min(PREFIX_BUDGET, max_steps),
+                                  deadline)
+        except OutOfTime:
+            pass    # the clock checks below report it
+    if start and (max_steps is None or start.steps <= max_steps):
+        cells = np.frombuffer(start.cells, np.uint8)
+        if len(cells) > CELLS:
+            tape = widen(tape, len(cells))
+        tape[:, :len(cells)] = cells
+        ptr[:], ip[:], steps[:], head = start.ptr, op_at(prog, start.pos), start.steps, start.output
+        if start.ptr >= tape.shape[1]:
+            tape = widen(tape, start.ptr)
+
+    rounds = 0
+    while True:
+        at = int(ip.min(initial=n))
+        if at >= n:
+            break
+        sel = np.flatnonzero(ip == at)
+        op, arg = ops[at], args[at]
+        p = ptr[sel]
+        failed = []     # (lanes, status, message), applied once the round is done
+        jump = None
+        if op == ADD:
+            tape[sel, p] += np.uint8(arg & 0xFF)
+        elif op == MOVE:
+            p += arg
+            if arg > 0:
+                if p.max() >= tape.shape[1]: tape = widen(tape, int(p.max()))
+            elif p.min() < 0:
+                bad = p < 0
+                failed.append((sel[bad], "error", "Pointer moved left of tape start"))
+                p[bad] = 0
+            ptr[sel] = p
+        elif op == JNZ:
+            taken = tape[sel, p] != 0
+            jump = np.where(taken, arg, at) + 1
+            if max_steps is not None:   # checked on back-edges, like _limits.Budget
+                over = taken & (steps[sel] > max_steps)
+                if over.any():
+                    failed.append((sel[over], "step_limit", f"Step limit of {max_steps} instructions exceeded"))
+        elif op == JZ:
+            jump = np.where(tape[sel, p] == 0, arg, at) + 1
+        elif op == SET:
+            tape[sel, p] = arg & 0xFF
+        elif op == MUL:
+            v = tape[sel, p]
+            nz = v != 0
+            if nz.any():
+                s, q, v = sel[nz], p[nz], v[nz]
+                lo, hi = arg[0][0], arg[-1][0]
+                if q.max() + hi >= tape.shape[1]: tape = widen(tape, int(q.max()) + hi)
+                if lo < 0 and q.min() + lo < 0:
+                    bad = q + lo < 0
+                    failed.append((s[bad], "error", "Pointer moved left of tape start"))
+                    s, q, v = s[~bad], q[~bad], v[~bad]
+                for off, k in arg:
+                    tape[s, q + off] += v * np.uint8(k & 0xFF)
+                tape[s, q] = 0
+        elif op == SCAN:
+            s, q = sel, p
+            while True:
+                moving = tape[s, q] != 0
+                if not moving.any():
+                    break
+                s, q = s[moving], q[moving] + arg
+                if arg > 0:
+                    if q.max() >= tape.shape[1]: tape = widen(tape, int(q.max()))
+                elif q.min() < 0:
+                    bad = q < 0
+                    failed.append((s[bad], "error", "Pointer moved left of tape start"))
+                    s, q = s[~bad], q[~bad]
+                ptr[s] = q
+        elif op == OUT:
+            if out_len[sel].max() >= out.shape[1]: out = widen(out, int(out_len[sel].max()))
+            out[sel, out_len[sel]] = tape[sel, p]
+            out_len[sel] += 1
+        elif op == IN:
+            pos = in_pos[sel]
+            has = pos < in_len[sel]
+            tape[sel[has], p[has]] = in_buf[sel[has], pos[has]]
+            in_pos[sel[has]] += 1
+            if eof is not None and not has.all():
+                tape[sel[~has], p[~has]] = eof & 0xFF
+        ip[sel] = at + 1 if jump is None else jump
+        steps[sel] += 1
+        for bad, kind, msg in failed:
+            ip[bad] = n
+            for i in bad.tolist():
+                status[i], errors[i] = kind, msg
+        rounds += 1
+        if deadline is not None and not rounds % CHECK_EVERY and time.monotonic() > deadline:
+            for i in np.flatnonzero(ip < n).tolist():
+                status[i], errors[i] = "timeout", f"Time limit of {timeout}s exceeded"
+            break
+
+    return [Lane(status[i], head + out[i, :out_len[i]].tobytes(), int(steps[i]), errors[i]) for i in range(lanes)]
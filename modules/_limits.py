@@ -0,0 +1,81 @@
+"""Instruction and wall-clock budgets for the dialect engines.
+
+Engines count executed instructions in `steps` and, on loop back-edges, compare it with
+budget.next; only then does Budget.check look at the clock. Given the run's _output.Output,
+those checks also flush output that has waited past its due time, so a program that prints
+a little and then computes for a while still shows it. Without limits or output next is
+infinite and the comparison never fires. A run that starts from a _prefix has already
+executed that prefix's instructions; Budget.skip counts them for engines whose own counter
+starts at zero.
+"""
+import time
+
+CHECK_EVERY = 1 << 16   # instructions between wall-clock checks
+
+class StepLimitExceeded(RuntimeError):
+    pass
+
+class TimeLimitExceeded(RuntimeError):
+    pass
+
+class Budget:
+    def __init__(self, max_steps=None, timeout=None, out=None):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.out = out
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.done = 0    # instructions executed before the engine's count started
+        self.next = self.check(0)
+
+    def skip(self, steps):
+        """Count steps executed outside the engine (a _prefix); returns the next check."""
+        self.done += steps
+        return self.check(0)
+
+    def check(self, steps):
+        """Raise if a limit is exceeded, else return the step count of the next check."""
+        steps += self.done
+        if self.max_steps is not None and steps > self.max_steps:
+            raise StepLimitExceeded(f"Step limit of {self.max_steps} instructions exceeded")
+        out = self.out
+        if out is not None and out.buf and time.monotonic() > out.due:
+            out.flush()
+        if self.deadline is not None:
+            if time.monotonic() > self.deadline:
+                raise TimeLimitExceeded(f"Time limit of {self.timeout}s exceeded")
+            nxt = steps + CHECK_EVERY
+        elif out is not None:
+            nxt = steps + CHECK_EVERY
+        else:
+            nxt = float("inf")
+        if self.max_steps is not None:
+            nxt = min(nxt, self.max_steps + 1)
+        nxt -= self.done
+        self.next = nxt
+        return nxt
+
+class OutputLimitExceeded(RuntimeError):
+    pass
+
+def capped_output(chunks, max_bytes):
+    """on_output hook collecting text into `chunks`, raising once more than max_bytes were produced;
+    the first max_bytes characters are kept."""
+    total = [0]
+    def on_output(s):
+        if max_bytes is not None and total[0] + len(s) > max_bytes:
+            if total[0] < max_bytes:
+                chunks.append(s[:max_bytes - total[0]])
+                total[0] = max_bytes
+            raise OutputLimitExceeded(f"Output limit of {max_bytes} characters exceeded")
+        total[0] += len(s)
+        chunks.append(s)
+    return on_output
+
+def outcome(e):
+    """(status, message) for an exception that ended a run, as batch and serve report it:
+    step_limit, timeout, output_limit or error."""
+    for cls, status in ((StepLimitExceeded, "step_limit"), (TimeLimitExceeded, "timeout"),
+                        (OutputLimitExceeded, "output_limit")):
+        if isinstance(e, cls):
+            return status, str(e)
+    return "error", f"{type(e).__name__}: {e}"
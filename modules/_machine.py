@@ -0,0 +1,246 @@
+"""Resumable BF machine: a run that executes in slices and can be checkpointed.
+
+    m = Machine(code, input=b"...")
+    while not m.done:
+        m.run_until(time.monotonic() + 0.005)   # or m.run(100_000)
+        sys.stdout.buffer.write(m.take_output())
+    blob = m.snapshot()            # bytes; Machine.restore(blob) continues where m stopped
+
+A Machine executes the folded IR of `optimized` (so instructions count IR ops) and keeps
+its whole state between calls: ip, ptr, the tape, output not yet taken and the input
+position. With more_input=True, running out of input pauses the machine (waiting) instead
+of hitting end of input, until feed() or close_input(). set_breakpoints() makes run() stop
+before the marked instructions, and run(..., watch=cell) stops right after any instruction
+that writes that cell (the debugger's watchpoints; see _history).
+
+Snapshots are MAGIC | u16 SNAPSHOT_VERSION | zlib(u32 len(header) | JSON header | blobs).
+The header holds the scalars and blob sizes; the blobs are the source, the unread input,
+the pending output and the tape as PAGE-cell pages, with all-zero pages left out, so a
+checkpoint costs about as much as the part of the tape the program has touched.
+"""
+import json, struct, sys, time, zlib
+from array import array
+from _ir import compile_cached, op_for_break, ADD, MOVE, SET, SCAN, MUL, OUT, IN, JZ, JNZ, BRK
+from _tape import new_tape, cell_mask, grow
+
+MAGIC = b"BFMS"
+SNAPSHOT_VERSION = 1
+PAGE = 4096          # cells per snapshot page
+SLICE = 1 << 16      # instructions between clock checks in run_until
+
+class Machine:
+    def __init__(self, code, input=b"", eof=0, cell_bits=8, cells=31000, level=2, more_input=False):
+        if eof not in (0, -1, None):
+            raise ValueError(f"eof must be 0, -1 or None, not {eof!r}")
+        self.code, self.level, self.cell_bits, self.eof = code, level, cell_bits, eof
+        self.prog = compile_cached(code, level)
+        self.tape = new_tape(cells, cell_bits)
+        self.ip = self.ptr = self.steps = 0
+        self.input = bytearray(input.encode("utf-8") if isinstance(input, str) else input)
+        self.input_pos = 0        # into self.input; self.consumed counts every byte ever read
+        self.consumed = 0
+        self.input_closed = not more_input
+        self.output = bytearray()
+        self.done = not self.prog.ops
+        self.trapped = None       # ops with BRK patched over breakpoints
+        self.break_at = -1        # source offset of the breakpoint the last run() stopped at
+        self.wrote = False        # whether the last run() stopped on its watch
+
+    @property
+    def waiting(self):
+        """True when the machine stopped at ',' for input that hasn't been fed yet."""
+        return (not self.done and not self.input_closed and self.input_pos >= len(self.input)
+                and self.prog.ops[self.ip] == IN)
+
+    def feed(self, data):
+        if self.input_closed:
+            raise ValueError("Input is closed")
+        if self.input_pos > len(self.input) // 2:
+            del self.input[:self.input_pos]
+            self.input_pos = 0
+        self.input += data.encode("utf-8") if isinstance(data, str) else data
+
+    def close_input(self):
+        self.input_closed = True
+
+    def take_output(self):
+        """Output produced since the last call, as bytes."""
+        out = bytes(self.output)
+        self.output.clear()
+        return out
+
+    def set_breakpoints(self, offsets):
+        """Stop before the instruction at each source offset (the folded op, inside a folded
+        loop), or the first one after it."""
+        traps = {op_for_break(self.prog, self.code, p) for p in offsets} - {len(self.prog.ops)}
+        self.trapped = [BRK if i in traps else op for i, op in enumerate(self.prog.ops)] if traps else None
+
+    def run(self, max_instructions, watch=-1):
+        """Execute up to max_instructions instructions and return how many ran: fewer at the
+        end of the program (done), when waiting for input, at a breakpoint (break_at) or right
+        after an instruction wrote cell `watch` (wrote)."""
+        self.break_at, self.wrote = -1, False
+        if self.done or max_instructions <= 0:
+            return 0
+        ran = 0
+        ops = self.trapped or self.prog.ops
+        if ops[self.ip] == BRK:
+            # resuming from a breakpoint: its own instruction runs untrapped
+            ran = self._run(1, self.prog.ops, watch)
+            if self.done or self.wrote or not ran:
+                return ran
+        ran += self._run(max_instructions - ran, ops, watch)
+        if not self.done and ops[self.ip] == BRK and ran < max_instructions and not self.wrote:
+            self.break_at = self.prog.pos[self.ip]
+        return ran
+
+    def _run(self, max_instructions, ops, watch):
+        args = self.prog.args
+        n = len(ops)
+        tape, mask, out = self.tape, cell_mask(self.cell_bits), self.output
+        fast_scan = self.cell_bits == 8
+        ip, ptr, steps = self.ip, self.ptr, self.steps
+        start, limit = steps, steps + max_instructions
+        try:
+            while ip < n:
+                if steps >= limit:
+                    break
+                op = ops[ip]
+                if op == ADD:
+                    tape[ptr] = (tape[ptr] + args[ip]) & mask
+                    if ptr == watch:
+                        self.wrote = True
+                        ip += 1; steps += 1
+                        break
+                elif op == MOVE:
+                    ptr += args[ip]
+                    if ptr >= len(tape): grow(tape, ptr)
+                    elif ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+                elif op == JNZ:
+                    if tape[ptr] != 0: ip = args[ip]
+                elif op == JZ:
+                    if tape[ptr] == 0: ip = args[ip]
+                elif op == SET:
+                    tape[ptr] = args[ip] & mask
+                    if ptr == watch:
+                        self.wrote = True
+                        ip += 1; steps += 1
+                        break
+                elif op == MUL:
+                    v = tape[ptr]
+                    if v:
+                        terms = args[ip]
+                        if ptr + terms[-1][0] >= len(tape): grow(tape, ptr + terms[-1][0])
+                        if ptr + terms[0][0] < 0: raise RuntimeError("Pointer moved left of tape start")
+                        for off, k in terms:
+                            tape[ptr+off] = (tape[ptr+off] + v * k) & mask
+                        tape[ptr] = 0
+                        if watch >= 0 and (watch == ptr or any(ptr + off == watch for off, _ in terms)):
+                            self.wrote = True
+                            ip += 1; steps += 1
+                            break
+                elif op == SCAN:
+                    step = args[ip]
+                    if fast_scan and step == 1:
+                        ptr = tape.find(b"\0", ptr)
+                        if ptr < 0:
+                            ptr = len(tape)
+                            grow(tape, ptr)
+                    elif fast_scan and step == -1:
+                        ptr = tape.rfind(b"\0", 0, ptr + 1)
+                        if ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+                    else:
+                        while tape[ptr]:
+                            ptr += step
+                            if ptr >= len(tape): grow(tape, ptr)
+                            elif ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+                elif op == OUT:
+                    out.append(tape[ptr] & 0xFF)
+                elif op == IN:
+                    if self.input_pos < len(self.input):
+                        tape[ptr] = self.input[self.input_pos] & mask
+                        self.input_pos += 1
+                        self.consumed += 1
+                    elif not self.input_closed:
+                        break    # waiting: resume at this ',' once fed
+                    elif self.eof is not None:
+                        tape[ptr] = self.eof & mask
+                    if ptr == watch:
+                        self.wrote = True
+                        ip += 1; steps += 1
+                        break
+                elif op == BRK:
+                    break
+                ip += 1
+                steps += 1
+        finally:
+            self.ip, self.ptr, self.steps = ip, ptr, steps
+            self.done = ip >= n
+        return steps - start
+
+    def run_until(self, deadline):
+        """Run until time.monotonic() passes deadline, the program ends or it waits for input;
+        returns the instructions executed."""
+        total = 0
+        while not self.done and time.monotonic() < deadline:
+            ran = self.run(SLICE)
+            total += ran
+            if not ran or self.waiting or self.break_at >= 0:
+                break
+        return total
+
+    def snapshot(self):
+        """The machine's full state as bytes (see the module docstring)."""
+        tape = self.tape
+        pages, blobs = [], []
+        for lo in range(0, len(tape), PAGE):
+            page = tape[lo:lo + PAGE]
+            if any(page):
+                if isinstance(page, array):
+                    if sys.byteorder == "big": page.byteswap()
+                    page = page.tobytes()
+                pages.append(lo // PAGE)
+                blobs.append(bytes(page))
+        source = self.code.encode("utf-8", "surrogatepass")
+        unread = bytes(self.input[self.input_pos:])
+        header = {"level": self.level, "cell_bits": self.cell_bits, "eof": self.eof, "cells": len(tape),
+                  "ip": self.ip, "ptr": self.ptr, "steps": self.steps, "done": self.done,
+                  "ops": len(self.prog.ops), "consumed": self.consumed, "input_closed": self.input_closed,
+                  "sizes": [len(source), len(unread), len(self.output)] + [len(b) for b in blobs],
+                  "pages": pages}
+        head = json.dumps(header).encode()
+        body = b"".join([struct.pack("<I", len(head)), head, source, unread, bytes(self.output)] + blobs)
+        return MAGIC + struct.pack("<H", SNAPSHOT_VERSION) + zlib.compress(body)
+
+    @classmethod
+    def restore(cls, blob):
+        """A Machine in the state snapshot() captured."""
+        if blob[:4] != MAGIC:
+            raise ValueError("Not a machine snapshot")
+        version, = struct.unpack("<H", blob[4:6])
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        body = zlib.decompress(blob[6:])
+        n, = struct.unpack("<I", body[:4])
+        h = json.loads(body[4:4 + n])
+        parts, pos = [], 4 + n
+        for size in h["sizes"]:
+            parts.append(body[pos:pos + size])
+            pos += size
+        source, unread, output = parts[:3]
+        m = cls(source.decode("utf-8", "surrogatepass"), unread, h["eof"], h["cell_bits"], h["cells"], h["level"],
+                more_input=not h["input_closed"])
+        if len(m.prog.ops) != h["ops"]:
+            raise ValueError("Snapshot was taken with a different IR compiler")
+        m.ip, m.ptr, m.steps, m.done, m.consumed = h["ip"], h["ptr"], h["steps"], h["done"], h["consumed"]
+        m.output += output
+        tape = m.tape
+        for index, data in zip(h["pages"], parts[3:]):
+            lo = index * PAGE
+            if isinstance(tape, array):
+                page = array(tape.typecode, data)
+                if sys.byteorder == "big": page.byteswap()
+                tape[lo:lo + len(page)] = page
+            else:
+                tape[lo:lo + len(data)] = data
+        return m
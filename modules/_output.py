@@ -0,0 +1,37 @@
+"""Buffered output for the '.' instruction.
+
+Engines append byte values to out.buf and call out.flush() once len(out.buf) >= out.limit.
+The limit adapts to the program: it doubles while output arrives faster than FAST seconds
+per flush (chatty programs pay for few, large on_output calls) and drops back to MIN_FLUSH
+when output slows down. Output still in the buffer at out.due (SLOW seconds after the last
+flush) is flushed by the run's _limits.Budget on its next back-edge check, so occasional
+prints show up promptly even after a fast phase has grown the limit.
+"""
+import codecs, time
+
+MIN_FLUSH = 64
+MAX_FLUSH = 1 << 16
+FAST = 0.02
+SLOW = 0.2
+
+class Output:
+    def __init__(self, on_output=None):
+        self.on_output = on_output
+        self.buf = bytearray()
+        self.limit = MIN_FLUSH
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.last = time.monotonic()
+        self.due = self.last + SLOW
+
+    def flush(self, final=False):
+        now = time.monotonic()
+        if now - self.last > SLOW:
+            self.limit = MIN_FLUSH
+        elif now - self.last < FAST and len(self.buf) >= self.limit:
+            self.limit = min(self.limit * 2, MAX_FLUSH)
+        self.last, self.due = now, now + SLOW
+        s = self.decoder.decode(bytes(self.buf), final)
+        self.buf.clear()
+        if s:
+            if self.on_output: self.on_output(s)
+            else: print(s, end="", flush=True)
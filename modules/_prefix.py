@@ -0,0 +1,115 @@
+"""Partial evaluation: run the input-independent start of a program once, ahead of time.
+
+evaluate() runs a program on a Machine with no input until its first ',' (or its end, or
+BUDGET instructions, or the run's max_steps) and returns where that got to as a Prefix: the
+source offset to carry on from, ptr, the instructions executed, the output printed and the
+tape up to its last non-zero cell. An engine run with hooks["prefix"] loads that state and executes only the
+residual program code[pos:], so a program that builds constants and prints fixed text
+starts with its output already there.
+
+A prefix always ends between top-level instructions (outside every loop), since that is a
+point every engine can start from: classic at a character, optimized at an IR op, compiled
+at a statement of its generated function. A run that stops inside a loop is replayed up to
+the last top-level instruction it passed. Prefixes go through the program cache, on disk
+whatever the source size, so the evaluation is paid once per program and machine. It runs
+inside the run's time limit: an evaluation that reaches the deadline is dropped, uncached.
+"""
+import time
+from array import array
+from collections import namedtuple
+from _cache import lookup
+from _ir import BRK, JZ, JNZ
+from _machine import Machine
+from _tape import grow
+
+BUDGET = 1 << 16    # instructions evaluated at most, so a long first loop costs little
+SLICE = 4096        # instructions between deadline checks
+
+Prefix = namedtuple("Prefix", "pos ptr steps output cells")
+
+# hooks that need to see the instructions a prefix would skip
+WATCHERS = ("on_step", "tick", "on_render", "profile", "tape_file")
+
+class OutOfTime(Exception):
+    """evaluate() passed its deadline; nothing is cached and the run starts from scratch."""
+
+def evaluate(code, level=2, cell_bits=8, budget=BUDGET, deadline=None):
+    """The Prefix of code for an engine running IR `level`, or None if there is nothing to skip.
+    Runs at most `budget` instructions; raises OutOfTime once time.monotonic() passes deadline."""
+    try:
+        m = Machine(code, cell_bits=cell_bits, level=level, more_input=True)
+        ops = m.prog.ops
+        top, depth = [], 0
+        for op in ops:
+            top.append(depth == 0)
+            depth += (op == JZ) - (op == JNZ)
+        top.append(True)
+        # stop before every top-level op: each runs at most once, so this costs one call per op
+        m.trapped = [BRK if t else op for op, t in zip(ops, top)]
+        last = 0
+        while not m.done and m.steps < budget:
+            if deadline is not None and time.monotonic() > deadline:
+                raise OutOfTime
+            if not m.run(min(budget - m.steps, SLICE)):
+                break    # waiting at the first ','
+            if m.break_at >= 0:
+                last = m.steps
+        if not top[m.ip]:
+            if not last:
+                return None
+            m = Machine(code, cell_bits=cell_bits, level=level, more_input=True)
+            m.run(last)
+    except (RuntimeError, SyntaxError):   # the engine will report it
+        return None
+    if not m.steps:
+        return None
+    raw = m.tape.tobytes() if isinstance(m.tape, array) else bytes(m.tape)
+    size = cell_bits // 8
+    used = -(-len(raw.rstrip(b"\0")) // size) * size   # whole cells up to the last non-zero one
+    pos = m.prog.pos[m.ip] if m.ip < len(ops) else len(code)
+    return Prefix(pos, m.ptr, m.steps, m.take_output(), raw[:used])
+
+def cached(code, level=2, cell_bits=8, budget=BUDGET, deadline=None):
+    """evaluate through the program cache (on disk whatever the source size); an evaluation
+    cut short by its deadline raises OutOfTime and is not cached."""
+    p = lookup("prefix", code, (level, cell_bits, budget),
+               lambda: tuple(evaluate(code, level, cell_bits, budget, deadline) or ()), disk_min=0)
+    return Prefix(*p) if p else None
+
+def start(code, hooks, level, cell_bits=8, budget=None, step_delay=0.0):
+    """The Prefix an engine run should start from: None unless hooks["prefix"] is set (True, or
+    a Prefix from evaluate for this level), nothing watches every instruction, no breakpoint
+    falls inside it and it fits in the run's _limits.Budget. Evaluating it runs at most
+    budget.max_steps instructions and stops at budget.deadline, so it counts against the run's limits."""
+    want = hooks.get("prefix")
+    if not want or step_delay > 0.0 or any(hooks.get(k) for k in WATCHERS):
+        return None
+    max_steps = budget.max_steps if budget else None
+    if isinstance(want, Prefix):
+        p = want
+    else:
+        try:
+            p = cached(code, level, cell_bits, BUDGET if max_steps is None else min(BUDGET, max_steps),
+                       budget.deadline if budget else None)
+        except OutOfTime:
+            return None
+    if p is None or (max_steps is not None and p.steps > max_steps):
+        return None
+    if any(b < p.pos for b in hooks.get("breakpoints") or ()):
+        return None
+    return p
+
+def load(p, tape, out):
+    """Put p's cells on tape and its output into out (an _output.Output); returns p.ptr."""
+    cells = p.cells
+    if isinstance(tape, array):
+        cells = array(tape.typecode, cells)
+    elif isinstance(tape, memoryview) and tape.itemsize > 1:   # _tape.shared_tape
+        cells = memoryview(cells).cast(tape.format)
+    if len(cells) > len(tape):
+        grow(tape, len(cells) - 1)
+    tape[:len(cells)] = cells
+    if p.output:
+        out.buf += p.output
+        out.flush()
+    return p.ptr
@@ -0,0 +1,183 @@
+"""Run a dialect in a child process, with its tape and frames in shared memory.
+
+The parent creates the shared tape and a shared memory block and reads them in place:
+  tape  - the engine's fixed-size tape, a file both processes map (_tape.shared_tape)
+  state - a multiprocessing.shared_memory block: int64 [ptr, frames] followed by two framebuffer slots; a new frame goes to slot
+          frames + 1 & 1 before frames is bumped, so the reader never sees a half-written one
+Everything else is small tuples over a Pipe:
+  parent -> child: "pause", "step", "cont"
+  child -> parent: ("out", text), ("break", pos), ("error", msg), ("done", steps)
+The engine never waits for the parent except while paused, and stopping is a kill().
+"""
+import importlib, multiprocessing, os, weakref
+from multiprocessing.shared_memory import SharedMemory
+from _tape import shared_tape, close_tape
+from _render import framebuffer as make_framebuffer
+
+TAPE_CELLS = 1 << 20   # fixed: shared tapes can't grow (pages are only allocated when touched)
+PTR, FRAMES = 0, 1
+HEADER = 16            # bytes before the frame slots
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def child(conn, dialect, code, tape_path, cells, state_name, cell_bits, options):
+    """Child process entry: run code on the shared tape and report over conn."""
+    tape, _ = shared_tape(cells, cell_bits, tape_path)
+    state_shm = SharedMemory(state_name)
+    state = state_shm.buf[:HEADER].cast("q")
+    paused = stepped = False
+
+    def handle(msg):
+        nonlocal paused, stepped
+        if msg == "pause": paused = True
+        elif msg == "step": paused = stepped = True
+        elif msg == "cont": paused = False
+
+    def poll(tape, ptr):
+        state[PTR] = ptr
+        while conn.poll():
+            handle(conn.recv())
+        return paused
+
+    def tick():
+        nonlocal stepped
+        while conn.poll():
+            handle(conn.recv())
+        while paused and not stepped:
+            handle(conn.recv())
+        stepped = False
+
+    def on_step(tape, ptr):
+        state[PTR] = ptr
+
+    def on_break(pos):
+        nonlocal paused
+        paused = True
+        conn.send(("break", pos))
+
+    hooks = {"on_output": lambda s: conn.send(("out", s)), "on_step": on_step, "tick": tick, "poll": poll,
+             "on_break": on_break, "tape": tape, "breakpoints": options.get("breakpoints"),
+             "input": options.get("input", b""), "eof": options.get("eof", 0)}
+    fb = options.get("framebuffer")
+    if fb:
+        size = fb.width * fb.height
+        def on_render(buf, w, h):
+            n = state[FRAMES] + 1
+            start = HEADER + (n & 1) * size
+            slot = state_shm.buf[start:start + size]
+            slot[:] = buf if buf.format == "B" else bytes(v & 0xFF for v in buf)
+            slot.release()
+            state[FRAMES] = n
+        hooks["on_render"], hooks["framebuffer"] = on_render, fb
+    if options.get("profile"):
+        hooks["profile"] = importlib.import_module("_profile").Profile()
+    try:
+        steps = importlib.import_module(dialect).run(code, hooks=hooks, cell_bits=cell_bits)
+        if options.get("profile"):
+            conn.send(("profile", hooks["profile"].slots, hooks["profile"].counters))
+        conn.send(("done", steps))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        hooks.clear()
+        close_tape(tape)
+        state.release()
+        state_shm.close()
+
+class Process:
+    """Parent side of one run: owns the shared blocks, which stay readable after the child
+    exits until close(). start() launches the child; messages() collects what it sent.
+    breakpoints, input, eof, framebuffer (spec or None for no rendering) and profile (a
+    _profile.Profile to fill in at the end) mean what the same hooks do for the engines.
+    """
+    def __init__(self, dialect, code, cells=TAPE_CELLS, cell_bits=8, breakpoints=(), input=b"", eof=0,
+                 framebuffer=None, profile=None):
+        self.code = code
+        self.profile = profile
+        fb = make_framebuffer(framebuffer) if framebuffer is not None else None
+        size = fb.width * fb.height if fb else 0
+        if fb:
+            cells = max(cells, fb.flag + 1, fb.base + size)
+        self.fb = fb
+        self.tape, self.tape_path = shared_tape(cells, cell_bits)
+        # the tape file outlives a parent that never calls close(); remove it at exit at the latest
+        self.remove_tape = weakref.finalize(self, remove_file, self.tape_path)
+        self.state_shm = SharedMemory(create=True, size=HEADER + 2 * size)
+        self.state = self.state_shm.buf[:HEADER].cast("q")
+        self.state[PTR] = self.state[FRAMES] = 0
+        ctx = multiprocessing.get_context("spawn")   # a forked copy of a threaded GUI isn't safe
+        self.conn, child_conn = ctx.Pipe()
+        options = {"breakpoints": list(breakpoints), "input": input, "eof": eof, "framebuffer": fb,
+                   "profile": profile is not None}
+        self.proc = ctx.Process(target=child, daemon=True,
+                                args=(child_conn, dialect, code, self.tape_path, cells, self.state_shm.name, cell_bits, options))
+        self.done = self.killed = False
+
+    def start(self):
+        self.proc.start()
+
+    def send(self, msg):
+        """"pause", "step" or "cont"."""
+        if not self.done:
+            try:
+                self.conn.send(msg)
+            except OSError:   # the child has exited; messages() will say how
+                pass
+
+    def ptr(self):
+        return self.state[PTR]
+
+    def frame(self):
+        """(frame number, a copy of its pixels, w, h) for the newest frame, or None. A copy, so
+        that no view of the shared block is left for close() to trip over."""
+        n = self.state[FRAMES]
+        if not n:
+            return None
+        size = self.fb.width * self.fb.height
+        start = HEADER + (n & 1) * size
+        return n, bytes(self.state_shm.buf[start:start + size]), self.fb.width, self.fb.height
+
+    def messages(self, timeout=0.0):
+        """Messages from the child within timeout seconds: ("out", text), ("break", pos),
+        ("error", msg) or ("done", steps). Sets done once the child has finished or died."""
+        res = []
+        try:
+            while not self.done and self.conn.poll(timeout):
+                msg = self.conn.recv()
+                timeout = 0.0
+                if msg[0] == "profile":
+                    self.profile.attach(self.code, msg[1])[:] = msg[2]
+                    continue
+                res.append(msg)
+                self.done = msg[0] in ("done", "error")
+        except (EOFError, OSError):
+            self.done = True
+            self.proc.join()
+            res.append(("error", "Stopped" if self.killed else f"Engine process exited with code {self.proc.exitcode}"))
+        return res
+
+    def kill(self):
+        if self.proc.is_alive():
+            self.killed = True
+            self.proc.kill()
+
+    def close(self):
+        """Kill the child if needed and free the shared memory."""
+        self.kill()
+        if self.proc.pid is not None:
+            self.proc.join()
+        self.conn.close()
+        try:
+            close_tape(self.tape)
+        finally:
+            self.tape = None
+            self.remove_tape()
+            try:
+                self.state.release()
+                self.state_shm.close()
+            finally:
+                self.state_shm.unlink()
@@ -0,0 +1,104 @@
+"""Loop profiles: which loops burn the cycles.
+
+An engine given hooks["profile"] = Profile() bumps one counter per loop iteration (on the
+loop's closing bracket, or at the top of the generated loop body in `compiled`) — no hook
+per instruction. Everything else follows from the program's structure: an instruction
+runs as often as the innermost loop body around it, and a loop is entered once per run
+of its parent's body. The IR engines don't fold loops ([-], [>], [->+<]) while profiling,
+so every loop has a trip count and the totals are real BF instructions.
+
+Counts are exact for runs that finish. For runs stopped early (error, limit) everything
+before the stop point is right, but straight-line code after it still shows as executed.
+"""
+from collections import namedtuple
+from _ir import JNZ
+
+BF_CHARS = "><+-,.[]"
+
+# open/close: source offsets of the brackets; cost: BF instructions executed inside,
+# nested loops included; iterations is None for folded loops
+Loop = namedtuple("Loop", "open close entries iterations cost")
+
+class Profile:
+    def __init__(self):
+        self.code = ""
+        self.slots = {}      # source offset of '[' -> index into counters
+        self.counters = []
+
+    def attach(self, code, slots):
+        """Called by the engine: returns the counter list to bump once per iteration of
+        each loop, indexed as in slots ({offset of '[': counter index})."""
+        self.code, self.slots = code, slots
+        self.counters = [0] * (max(slots.values(), default=-1) + 1)
+        return self.counters
+
+    def iterations(self):
+        return {p: self.counters[i] for p, i in self.slots.items()}
+
+    def counts(self):
+        """Executions per source offset (0 for non-BF characters)."""
+        iters = self.iterations()
+        out = [0] * len(self.code)
+        cur, stack = 1, []
+        for i, c in enumerate(self.code):
+            if c not in BF_CHARS:
+                continue
+            out[i] = cur
+            if c == "[":
+                stack.append(cur)
+                cur = iters.get(i, cur)
+            elif c == "]":
+                cur = stack.pop()
+        return out
+
+    def loops(self, counts=None):
+        """Every loop as a Loop, most expensive first."""
+        counts = counts or self.counts()
+        iters = self.iterations()
+        prefix = [0]
+        for n in counts:
+            prefix.append(prefix[-1] + n)
+        res, stack = [], []
+        for i, c in enumerate(self.code):
+            if c == "[":
+                stack.append(i)
+            elif c == "]":
+                j = stack.pop()
+                res.append(Loop(j, i, counts[j], iters.get(j), prefix[i + 1] - prefix[j]))
+        res.sort(key=lambda l: -l.cost)
+        return res
+
+    def line_col(self, p):
+        line = self.code.count("\n", 0, p) + 1
+        return line, p - self.code.rfind("\n", 0, p)
+
+    def report(self, top=20):
+        """Plain-text report: hottest loops and hottest lines."""
+        counts = self.counts()
+        total = sum(counts) or 1
+        lines = [f"{sum(counts):,} BF instructions executed", "",
+                 f"{'loop at':>10} {'share':>7} {'instructions':>15} {'entries':>12} {'iterations':>14} {'avg trip':>10}"]
+        for l in self.loops(counts)[:top]:
+            ln, col = self.line_col(l.open)
+            if l.iterations is None:
+                it, trip = "folded", "-"
+            else:
+                it, trip = f"{l.iterations:,}", f"{l.iterations / l.entries:.1f}" if l.entries else "-"
+            lines.append(f"{f'{ln}:{col}':>10} {100 * l.cost / total:6.1f}% {l.cost:>15,} {l.entries:>12,} {it:>14} {trip:>10}")
+
+        per_line, start = [], 0
+        for ln, text in enumerate(self.code.split("\n"), 1):
+            per_line.append((sum(counts[start:start + len(text)]), ln, text))
+            start += len(text) + 1
+        per_line.sort(reverse=True)
+        lines += ["", f"{'line':>10} {'share':>7} {'instructions':>15}  source"]
+        for n, ln, text in per_line[:top]:
+            if not n:
+                break
+            lines.append(f"{ln:>10} {100 * n / total:6.1f}% {n:>15,}  {text.strip()[:48]}")
+        return "\n".join(lines)
+
+def ir_slots(prog):
+    """Counter slots for an IR program: one per JNZ, keyed by the source offset of its '['."""
+    ops, args, pos = prog
+    return {pos[j]: i for i, (op, j) in enumerate(zip(ops, args)) if op == JNZ}
@@ -0,0 +1,55 @@
+"""Framebuffer geometry for the render window protocol.
+
+A program draws by writing pixels to tape[base : base + width*height] and then setting the
+flag cell non-zero; the engine hands those cells to on_render(buf, width, height) and
+clears the flag. Runs pick their geometry with hooks["framebuffer"] (a Framebuffer or a
+dict of its fields); the default is 16x16 at cell 30000 with the flag right after it.
+
+palette is for the display side: None (grayscale), "rgb332" (bits RRRGGGBB) or a sequence
+of 256 0xRRGGBB colors.
+"""
+from collections import namedtuple
+from _tape import emit_frame, grow
+
+Framebuffer = namedtuple("Framebuffer", "width height base flag palette",
+                         defaults=(16, 16, 30000, None, None))
+
+PALETTES = ("gray", "rgb332")
+
+def framebuffer(spec=None):
+    """Normalize None / dict / Framebuffer into a Framebuffer with its flag cell filled in."""
+    if spec is None:
+        fb = Framebuffer()
+    elif isinstance(spec, dict):
+        fb = Framebuffer(**spec)
+    else:
+        fb = Framebuffer(*spec)
+    if fb.width <= 0 or fb.height <= 0 or fb.base < 0:
+        raise ValueError(f"Bad framebuffer geometry: {fb.width}x{fb.height} at {fb.base}")
+    if fb.flag is None:
+        fb = fb._replace(flag=fb.base + fb.width * fb.height)
+    elif fb.base <= fb.flag < fb.base + fb.width * fb.height:
+        raise ValueError(f"Render flag cell {fb.flag} lies inside the framebuffer")
+    return fb
+
+def renderer(tape, fb, on_render):
+    """Grow tape to cover the framebuffer and return the engine's render(): emit the frame,
+    clear the flag."""
+    grow(tape, max(fb.flag, fb.base + fb.width * fb.height - 1))
+    base, size, w, h, flag = fb.base, fb.width * fb.height, fb.width, fb.height, fb.flag
+    def render():
+        emit_frame(tape, base, size, on_render, w, h)
+        tape[flag] = 0
+    return render
+
+def color_table(palette=None):
+    """256 0xAARRGGBB entries for an indexed image."""
+    if palette in (None, "gray"):
+        return [0xFF000000 | v * 0x010101 for v in range(256)]
+    if palette == "rgb332":
+        return [0xFF000000 | ((v >> 5) * 255 // 7) << 16 | ((v >> 2 & 7) * 255 // 7) << 8 | (v & 3) * 85
+                for v in range(256)]
+    table = [0xFF000000 | (c & 0xFFFFFF) for c in palette]
+    if len(table) != 256:
+        raise ValueError("A palette needs 256 colors")
+    return table
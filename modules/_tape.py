@@ -0,0 +1,128 @@
+"""Tape storage shared by the dialect engines.
+
+8-bit tapes are a bytearray (one byte per cell); 16- and 32-bit cells use array('H') / array('I').
+Big tapes (SPARSE_MIN bytes and up) and file-backed ones are a fixed-size mmap instead, cast to
+a memoryview for wider cells: the OS hands out its pages on first touch, so a tape of hundreds
+of millions of cells costs memory only for the regions a program actually uses. shared_tape
+maps one such file in several processes. Engines run on hooks["tape"] instead of a new tape
+when it is given. All of them support tape[i], tape[i] = v, len(tape) and slicing; only the first two grow.
+8-bit tapes also support find/rfind of b"\0".
+"""
+import mmap, os, sys, tempfile
+from array import array
+
+CELL_TYPES = {8: None, 16: "H", 32: "I"}
+SPARSE_MIN = 1 << 24   # bytes; tapes at least this big are mmap-backed
+SHARED_DIR = "/dev/shm"
+
+def new_tape(cells, cell_bits=8, file=None):
+    """Zeroed tape of `cells` cells, each `cell_bits` wide. With file, the tape is that file
+    memory-mapped (created or extended to size; existing contents are kept)."""
+    if cell_bits not in CELL_TYPES:
+        raise ValueError(f"Unsupported cell width: {cell_bits} (use 8, 16 or 32)")
+    size = cells * cell_bits // 8
+    if file is None and size < SPARSE_MIN:
+        if cell_bits == 8:
+            return bytearray(cells)
+        return array(CELL_TYPES[cell_bits], bytes(size))
+    if file is None:
+        m = mmap.mmap(-1, size)
+    else:
+        fd = os.open(file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)   # sparse on filesystems that support it
+            m = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+    return m if cell_bits == 8 else memoryview(m).cast(CELL_TYPES[cell_bits])
+
+def shared_tape(cells, cell_bits=8, path=None):
+    """(tape, path): a file-backed tape that other processes can map too, for runs whose tape
+    another process reads. Without path a new file is made in SHARED_DIR (RAM-backed where the
+    OS has one) or the temp directory; whoever created it removes it once every side is done.
+    Fixed-size like the other mmap tapes."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="bftape-", dir=SHARED_DIR if os.path.isdir(SHARED_DIR) else None)
+        os.close(fd)
+    return new_tape(cells, cell_bits, path), path
+
+def close_tape(tape):
+    """Unmap an mmap-backed tape now rather than when it is garbage collected."""
+    if isinstance(tape, memoryview):
+        m = tape.obj
+        tape.release()
+        tape = m
+    if isinstance(tape, mmap.mmap):
+        tape.close()
+
+def cell_mask(cell_bits=8):
+    return (1 << cell_bits) - 1
+
+def grow(tape, upto):
+    """Extend tape with zero cells so that index `upto` is valid (by at least a quarter of its
+    length, so programs walking right don't grow it cell by cell). mmap tapes are fixed-size."""
+    if upto < len(tape):
+        return
+    n = max(upto + 1 - len(tape), len(tape) // 4)
+    if isinstance(tape, bytearray):
+        tape.extend(bytes(n))
+    elif isinstance(tape, array):
+        tape.frombytes(bytes(n * tape.itemsize))
+    else:
+        raise RuntimeError(f"Pointer moved past the end of the tape ({len(tape)} cells)")
+
+def emit_frame(tape, start, size, on_render, w, h):
+    """Hand tape[start:start+size] to on_render as a read-only memoryview (no copy).
+    The view is released when on_render returns; hooks that keep the frame must copy it.
+    """
+    with memoryview(tape)[start:start+size].toreadonly() as frame:
+        on_render(frame, w, h)
+
+def find(tape, value, start=0):
+    """Index of the first cell equal to value at or after start, wrapping around; -1 if none."""
+    for lo, hi in ((start, len(tape)), (0, start)):
+        if hasattr(tape, "index"):
+            try:
+                return tape.index(value, lo, hi)
+            except ValueError:
+                continue
+        # mmap tapes: search the raw bytes, skipping matches that straddle cells
+        raw, size = (tape, 1) if isinstance(tape, mmap.mmap) else (tape.obj, tape.itemsize)
+        needle = value.to_bytes(size, sys.byteorder)
+        i = raw.find(needle, lo * size, hi * size)
+        while i >= 0 and i % size:
+            i = raw.find(needle, i + 1, hi * size)
+        if i >= 0:
+            return i // size
+    return -1
+
+def snapshot(tape, start=0, end=None):
+    """Immutable copy of tape[start:end]: bytes for 8-bit tapes, a read-only view of a copy otherwise."""
+    part = tape[start:end]
+    if isinstance(part, (bytearray, bytes)):
+        return bytes(part)
+    if isinstance(part, memoryview):   # a slice of a wide mmap tape is a view: copy it
+        copy = array(part.format)
+        copy.frombytes(part.cast("B"))
+        part = copy
+    return memoryview(part).toreadonly()
+
+def dirty_ranges(old, new, chunk=64):
+    """[(start, new[start:end]), ...] for the chunks of `new` that differ from `old`.
+    Adjacent dirty chunks are merged; old=None marks everything dirty.
+    """
+    n = len(new)
+    if old is None or len(old) != n:
+        return [(0, new)] if n else []
+    ranges = []
+    start = None
+    for i in range(0, n, chunk):
+        if old[i:i+chunk] != new[i:i+chunk]:
+            if start is None: start = i
+        elif start is not None:
+            ranges.append((start, new[start:i]))
+            start = None
+    if start is not None:
+        ranges.append((start, new[start:]))
+    return ranges
@@ -1,27 +1,25 @@
+import time
+from bisect import bisect_left
+from _tape import new_tape, cell_mask, grow
+from _render import Framebuffer, framebuffer, renderer
+from _input import open_input
+from _output import Output
+from _cache import lookup
+from _limits import Budget
+from _prefix import start as prefix_start, load as load_prefix
 
-import sys, time
+# default framebuffer (see _render); runs can override it with hooks["framebuffer"]
+PLUGIN = {"kind": "dialect", "speed": 1, "stepping": True, "render": True, "profile": True,
+          "cell_bits": (8, 16, 32), "compiled": False}
 
-RENDER_WIDTH = 16
-RENDER_HEIGHT = 16
-RENDER_BASE = 30000
+RENDER_WIDTH, RENDER_HEIGHT, RENDER_BASE = Framebuffer()[:3]
 RENDER_SIZE = RENDER_WIDTH * RENDER_HEIGHT
 RENDER_FLAG = RENDER_BASE + RENDER_SIZE
 
-def run(code: str, hooks=None, cells=31000, step_delay=0.0, step_hook_rate=1):
-    """Classic BF interpreter.
-    hooks:
-      - on_step(tape, ptr)            : called every instruction
-      - on_output(text)               : buffered stdout
-      - on_render(buf, w, h)          : render window buffer
-      - tick()                        : may block; used for pause/step
-    """
-    hooks = hooks or {}
-    on_step = hooks.get("on_step")
-    on_output = hooks.get("on_output")
-    on_render = hooks.get("on_render")
-    tick = hooks.get("tick")
-
-    code = "".join(c for c in code if c in "><+-,.[]")
+def prepare(code: str):
+    """Filter to BF characters and pair brackets: (code, br, src_pos)."""
+    src_pos = [i for i, c in enumerate(code) if c in "><+-,.[]"]
+    code = "".join(code[i] for i in src_pos)
 
     # bracket pairs
     stack = []
@@ -36,56 +34,139 @@ def run(code: str, hooks=None, cells=31000, step_delay=0.0, step_hook_rate=1):
             br[i], br[j] = j, i
     if stack:
         raise SyntaxError(f"Unmatched '[' at {stack[-1]}")
+    return code, br, src_pos
 
-    tape = [0] * cells
+def run(code: str, hooks=None, cells=31000, step_delay=0.0, step_hook_rate=4096, cell_bits=8,
+        max_steps=None, timeout=None):
+    """Classic BF interpreter.
+    hooks:
+      - on_step(tape, ptr)            : called every instruction (tape is the live tape, don't keep it)
+      - on_output(text)               : buffered stdout
+      - on_render(buf, w, h)          : render window buffer (read-only memoryview, valid during the call)
+      - framebuffer                   : render geometry, a _render.Framebuffer or dict (default 16x16 at 30000)
+      - tick()                        : may block; used for pause/step
+      - poll(tape, ptr) -> bool       : enables tiered mode (see below)
+      - breakpoints                   : iterable of source offsets; a breakpoint stops before the
+                                        first instruction at or after that offset
+      - on_break(pos)                 : called with the source offset when a breakpoint is hit
+      - input                         : source for ',' (bytes, path, file, iterator; see _input.open_input),
+                                        default stdin
+      - eof                           : value ',' stores at end of input: 0 (default), -1 or None (unchanged)
+      - profile                       : a _profile.Profile to fill with loop iteration counts
+      - tape_file                     : back the tape with this memory-mapped file (see _tape.new_tape)
+      - tape                          : run on this tape (e.g. _tape.shared_tape) instead of a new one; cells is ignored
+      - prefix                        : True (or a _prefix.Prefix) to start from the state the program reaches
+                                        before its first ',', evaluated once and cached; ignored when a hook
+                                        above has to see those instructions
+    Without poll, tick/on_step/step_delay run on every instruction and breakpoints are checked on
+    every instruction too; step_hook_rate only applies with poll.
+    With poll, the run starts hook-free and calls poll every step_hook_rate loop iterations;
+    poll returning True (or a breakpoint) switches to per-instruction stepping with tick/on_step,
+    and poll returning False after a tick switches back to full speed.
+    cell_bits: 8 (bytearray tape), 16 or 32 (array tape); cells wrap around at 2**cell_bits
+    cells: initial tape length; from _tape.SPARSE_MIN bytes up the tape is a sparse fixed-size mmap
+    max_steps / timeout: raise _limits.StepLimitExceeded / TimeLimitExceeded once the run has
+    executed more instructions / seconds than allowed (checked on loop back-edges).
+    Returns the number of instructions executed.
+    """
+    hooks = hooks or {}
+    on_step = hooks.get("on_step")
+    on_output = hooks.get("on_output")
+    on_render = hooks.get("on_render")
+    tick = hooks.get("tick")
+    poll = hooks.get("poll")
+    on_break = hooks.get("on_break")
+    profile = hooks.get("profile")
+
+    source = code
+    code, br, src_pos = lookup("classic", code, (), lambda: prepare(code))
+    prof = profile.attach(source, {src_pos[br[i]]: i for i, c in enumerate(code) if c == "]"}) if profile else None
+
+    tape = hooks.get("tape") or new_tape(cells, cell_bits, hooks.get("tape_file"))
+    mask = cell_mask(cell_bits)
     ptr = 0
     ip = 0
-    out_buf = []
+    out = Output(on_output)
+    out_buf, flush_output = out.buf, out.flush
+    read = open_input(hooks.get("input"), hooks.get("eof", 0), before_fill=flush_output).read
+    # frames are only checked for after writes to the flag cell; flag = -1 turns that off
+    flag = -1
+    if on_render:
+        fb = framebuffer(hooks.get("framebuffer"))
+        render, flag = renderer(tape, fb, on_render), fb.flag
+
+    # breakpoints are '!' in a patched copy of the code, so the hook-free tier pays nothing for them
+    traps = {}
+    for p in hooks.get("breakpoints") or ():
+        i = bisect_left(src_pos, p)
+        if i < len(code): traps[i] = src_pos[i]
+    trapped = "".join('!' if i in traps else c for i, c in enumerate(code)) if traps else code
 
-    def flush_output():
-        if out_buf:
-            s = bytes(out_buf).decode('utf-8', 'replace')
-            if on_output: on_output(s)
-            else: print(s, end="")
-            out_buf.clear()
+    stepping = not poll and bool(tick or on_step or step_delay > 0.0)
+    countdown = step_hook_rate
+    held = -1   # breakpoint being resumed from
+    budget = Budget(max_steps, timeout, out)
+    steps = 0
+    prefix = prefix_start(source, hooks, 0, cell_bits, budget, step_delay)
+    if prefix:
+        ptr, ip, steps = load_prefix(prefix, tape, out), bisect_left(src_pos, prefix.pos), prefix.steps
+    next_check = budget.check(steps)   # evaluating the prefix took time too
 
     while ip < len(code):
-        if tick: tick()  # may pause/step
-        c = code[ip]
+        if stepping:
+            if tick: tick()  # may pause/step
+            if poll and not poll(tape, ptr):
+                stepping, countdown = False, step_hook_rate
+            # breakpoints apply while stepping too, except the one just reported
+            c = code[ip] if ip == held else trapped[ip]
+            held = -1
+        else:
+            c = trapped[ip]
         if c == '>':
             ptr += 1
-            if ptr >= len(tape): tape.append(0)
+            if ptr >= len(tape): grow(tape, ptr)
         elif c == '<':
             ptr -= 1
             if ptr < 0: raise RuntimeError("Pointer moved left of tape start")
         elif c == '+':
-            tape[ptr] = (tape[ptr] + 1) & 0xFF
+            tape[ptr] = (tape[ptr] + 1) & mask
+            if ptr == flag and tape[ptr]: render()
         elif c == '-':
-            tape[ptr] = (tape[ptr] - 1) & 0xFF
+            tape[ptr] = (tape[ptr] - 1) & mask
+            if ptr == flag and tape[ptr]: render()
         elif c == '.':
-            out_buf.append(tape[ptr])
-            if len(out_buf) >= 64: flush_output()
+            out_buf.append(tape[ptr] & 0xFF)
+            if len(out_buf) >= out.limit: flush_output()
         elif c == ',':
-            try:
-                ch = sys.stdin.read(1)
-                tape[ptr] = ord(ch) & 0xFF if ch else 0
-            except Exception:
-                tape[ptr] = 0
+            v = read()
+            if v is not None: tape[ptr] = v & mask
+            if ptr == flag and tape[ptr]: render()
         elif c == '[':
             if tape[ptr] == 0: ip = br[ip]
         elif c == ']':
-            if tape[ptr] != 0: ip = br[ip]
+            if prof: prof[ip] += 1
+            if tape[ptr] != 0:
+                ip = br[ip]
+                if steps >= next_check: next_check = budget.check(steps)
+                if poll and not stepping:
+                    # hook-free tier only looks at the pause flag on loop back-edges
+                    countdown -= 1
+                    if not countdown:
+                        countdown = step_hook_rate
+                        stepping = bool(poll(tape, ptr))
+        elif c == '!':
+            stepping, held = True, ip
+            if on_break: on_break(traps[ip])
+            if on_step: on_step(tape, ptr)
+            continue
 
         ip += 1
+        steps += 1
 
-        # render
-        if on_render and tape[RENDER_FLAG] != 0:
-            buf = tape[RENDER_BASE:RENDER_BASE+RENDER_SIZE]
-            on_render(list(buf), RENDER_WIDTH, RENDER_HEIGHT)
-            tape[RENDER_FLAG] = 0
-
-        if on_step: on_step(tape, ptr)
-        if step_delay > 0.0: time.sleep(step_delay)
+        if stepping:
+            if on_step: on_step(tape, ptr)
+            if step_delay > 0.0: time.sleep(step_delay)
 
-    flush_output()
+    flush_output(final=True)
     if on_step: on_step(tape, ptr)
+    return steps
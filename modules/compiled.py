@@ -0,0 +1,198 @@
+from _ir import compile_cached, op_at, ADD, MOVE, SET, SCAN, MUL, OUT, IN, JZ
+from _tape import new_tape, cell_mask, grow as grow_tape
+from _render import framebuffer, renderer
+from _input import open_input
+from _output import Output
+from _cache import lookup
+from _limits import Budget
+from _profile import ir_slots
+from _prefix import start as prefix_start, load as load_prefix
+import optimized
+
+# per-instruction hooks (stepping) run on optimized instead, so they are not listed here
+PLUGIN = {"kind": "dialect", "speed": 30, "stepping": False, "render": True, "profile": True,
+          "cell_bits": (8, 16, 32), "compiled": True}
+
+MAX_NESTING = 16   # CPython refuses more than 20 statically nested blocks per function
+
+def generate(prog, flag=None, mask=0xFF, profile=False, start=0):
+    """Translate an IR Program into Python source defining make(tape, output, render, grow, read, budget, prof).
+    make(...) returns (main, steps): main(ptr) -> ptr runs the program, steps() reports the
+    IR ops executed so far. Steps are counted once per straight-line segment, and the budget
+    is checked on loop back-edges. flag is the render flag cell (None: no rendering). With
+    profile, every loop body also bumps prof[<its JNZ>]. Loops nested deeper than MAX_NESTING
+    are split into helper functions so arbitrarily deep BF still compiles. start (a top-level
+    op) makes main begin there, for runs that start from a _prefix.
+    """
+    ops, args, _ = prog
+    funcs = []
+
+    def check_render(out, ind, lo=0, hi=0):
+        if flag is None:
+            return
+        if lo == hi == 0:
+            out.append(f"{ind}if ptr == {flag} and tape[ptr]: render()")
+        else:
+            out.append(f"{ind}if ptr + {lo} <= {flag} <= ptr + {hi} and tape[{flag}]: render()")
+
+    def block(start, end, depth, out, extra=0):
+        """Emit ops[start:end] at the given nesting depth into out.
+        extra: steps to add on entry (1 for a loop body, for its closing JNZ).
+        """
+        ind = "    " * (depth + 2)
+        first = len(out)
+        seg = [None, 0]   # index of the pending 'steps +=' line, op count
+
+        def count(k=1):
+            if seg[0] is None:
+                out.append(None)
+                seg[0] = len(out) - 1
+            seg[1] += k
+
+        def close_segment():
+            if seg[0] is not None:
+                out[seg[0]] = f"{ind}steps += {seg[1]}"
+                seg[0], seg[1] = None, 0
+
+        if extra:
+            count(extra)
+        i = start
+        while i < end:
+            op, arg = ops[i], args[i]
+            count()
+            if op == ADD:
+                out.append(f"{ind}tape[ptr] = (tape[ptr] + {arg}) & {mask}")
+                check_render(out, ind)
+            elif op == MOVE:
+                out.append(f"{ind}ptr += {arg}")
+                if arg > 0:
+                    out.append(f"{ind}if ptr >= len(tape): grow(ptr)")
+                else:
+                    out.append(f"{ind}if ptr < 0: raise RuntimeError('Pointer moved left of tape start')")
+            elif op == SET:
+                out.append(f"{ind}tape[ptr] = {arg & mask}")
+                if arg & mask:
+                    check_render(out, ind)
+            elif op == MUL:
+                lo, hi = arg[0][0], arg[-1][0]
+                out.append(f"{ind}v = tape[ptr]")
+                out.append(f"{ind}if v:")
+                if hi > 0:
+                    out.append(f"{ind}    if ptr + {hi} >= len(tape): grow(ptr + {hi})")
+                if lo < 0:
+                    out.append(f"{ind}    if ptr + {lo} < 0: raise RuntimeError('Pointer moved left of tape start')")
+                for off, k in arg:
+                    mul = "v" if k == 1 else f"v * {k}"
+                    out.append(f"{ind}    tape[ptr + {off}] = (tape[ptr + {off}] + {mul}) & {mask}")
+                out.append(f"{ind}    tape[ptr] = 0")
+                check_render(out, ind + "    ", min(lo, 0), max(hi, 0))
+            elif op == SCAN:
+                if mask == 0xFF and arg == 1:
+                    out.append(f"{ind}ptr = tape.find(b'\\0', ptr)")
+                    out.append(f"{ind}if ptr < 0: ptr = len(tape); grow(ptr)")
+                elif mask == 0xFF and arg == -1:
+                    out.append(f"{ind}ptr = tape.rfind(b'\\0', 0, ptr + 1)")
+                    out.append(f"{ind}if ptr < 0: raise RuntimeError('Pointer moved left of tape start')")
+                else:
+                    out.append(f"{ind}while tape[ptr]:")
+                    out.append(f"{ind}    ptr += {arg}")
+                    if arg > 0:
+                        out.append(f"{ind}    if ptr >= len(tape): grow(ptr)")
+                    else:
+                        out.append(f"{ind}    if ptr < 0: raise RuntimeError('Pointer moved left of tape start')")
+            elif op == OUT:
+                out.append(f"{ind}obuf.append(tape[ptr] & 255)" if mask != 0xFF else f"{ind}obuf.append(tape[ptr])")
+                out.append(f"{ind}if len(obuf) >= output.limit: flush()")
+            elif op == IN:
+                out.append(f"{ind}v = read()")
+                out.append(f"{ind}if v is not None: tape[ptr] = v & {mask}")
+                check_render(out, ind)
+            elif op == JZ:
+                close = arg
+                if depth >= MAX_NESTING:
+                    seg[1] -= 1   # the helper counts its own JZ
+                    close_segment()
+                    name = function(i, close + 1)
+                    out.append(f"{ind}ptr = {name}(ptr)")
+                else:
+                    close_segment()
+                    out.append(f"{ind}while tape[ptr]:")
+                    if profile:
+                        out.append(f"{ind}    prof[{close}] += 1")
+                    block(i + 1, close, depth + 1, out, extra=1)
+                    out.append(f"{ind}    if steps >= nxt: nxt = check(steps)")
+                i = close
+            i += 1
+        close_segment()
+        if len(out) == first:
+            out.append(ind + "pass")
+
+    def function(start, end):
+        """Emit ops[start:end] as a separate closure, return its name."""
+        name = f"_f{len(funcs)}"
+        funcs.append(None)
+        body = []
+        block(start, end, 0, body)
+        funcs[int(name[2:])] = [f"    def {name}(ptr):", "        nonlocal steps, nxt"] + body + ["        return ptr"]
+        return name
+
+    function(start, len(ops))
+    lines = ["def make(tape, output, render, grow, read, budget, prof=None):",
+             "    obuf, flush = output.buf, output.flush",
+             "    check, nxt, steps = budget.check, budget.next, 0"]
+    for f in reversed(funcs):
+        lines.extend(f)
+    lines.append("    return _f0, lambda: steps")
+    return "\n".join(lines) + "\n"
+
+def build(code: str, flag=None, level=2, cell_bits=8, profile=False, start=0):
+    """Compile BF source into a code object for the generated module (cached)."""
+    def make():
+        src = generate(compile_cached(code, level), flag, cell_mask(cell_bits), profile, start)
+        return compile(src, "<bf-compiled>", "exec")
+    return lookup("compiled", code, (flag, level, cell_bits, profile, start), make)
+
+def run(code: str, hooks=None, cells=31000, step_delay=0.0, step_hook_rate=4096, cell_bits=8,
+        max_steps=None, timeout=None, level=2):
+    """BF -> Python compiler: generates one Python function per program and runs it.
+    on_output, on_render, framebuffer, input, profile, prefix and limits behave as in optimized.run (steps count IR ops).
+    Per-instruction hooks (on_step, tick, poll, breakpoints) and step_delay need the
+    stepping interpreter, so those runs go to optimized.run.
+    """
+    hooks = hooks or {}
+    if any(hooks.get(k) for k in ("on_step", "tick", "poll", "breakpoints")) or step_delay > 0.0:
+        return optimized.run(code, hooks, cells, step_delay, step_hook_rate, cell_bits,
+                             max_steps, timeout, level)
+    on_output = hooks.get("on_output")
+    on_render = hooks.get("on_render")
+    profile = hooks.get("profile")
+    if profile:
+        level = min(level, 1)   # as in optimized.run: profiled loops stay unfolded
+
+    fb = framebuffer(hooks.get("framebuffer")) if on_render else None
+    out = Output(on_output)
+    budget = Budget(max_steps, timeout, out)
+    prefix = prefix_start(code, hooks, level, cell_bits, budget)
+    first = op_at(compile_cached(code, level), prefix.pos) if prefix else 0
+    ns = {}
+    exec(build(code, fb and fb.flag, level, cell_bits, bool(profile), first), ns)
+    prof = profile.attach(code, ir_slots(compile_cached(code, level))) if profile else None
+
+    tape = hooks.get("tape") or new_tape(cells, cell_bits, hooks.get("tape_file"))
+    read = open_input(hooks.get("input"), hooks.get("eof", 0), before_fill=out.flush).read
+
+    def grow(upto):
+        grow_tape(tape, upto)
+
+    render = renderer(tape, fb, on_render) if fb else None
+
+    ptr, done = 0, 0
+    if prefix:
+        ptr, done = load_prefix(prefix, tape, out), prefix.steps
+    budget.skip(done)   # also checks the clock: evaluating the prefix took time too
+    main, steps = ns["make"](tape, out, render, grow, read, budget, prof)
+    try:
+        main(ptr)
+    finally:
+        out.flush(final=True)
+    return done + steps()
@@ -0,0 +1,152 @@
+import time
+from _ir import compile_cached, op_at, op_for_break, ADD, MOVE, SET, SCAN, MUL, OUT, IN, JZ, JNZ, BRK
+from _tape import new_tape, cell_mask, grow as grow_tape
+from _render import framebuffer, renderer
+from _input import open_input
+from _output import Output
+from _limits import Budget
+from _profile import ir_slots
+from _prefix import start as prefix_start, load as load_prefix
+
+PLUGIN = {"kind": "dialect", "speed": 10, "stepping": True, "render": True, "profile": True,
+          "cell_bits": (8, 16, 32), "compiled": False}
+
+def run(code: str, hooks=None, cells=31000, step_delay=0.0, step_hook_rate=4096, cell_bits=8,
+        max_steps=None, timeout=None, level=2):
+    """Optimizing BF interpreter: runs the folded IR from _ir.compile_ir.
+    Same hooks, tiering, cell_bits and limits as classic.run; on_step/tick fire once per IR op,
+    not per character, and a breakpoint inside a folded loop stops at the folded op.
+    Steps (for max_steps and the return value) count IR ops; with hooks["profile"] loops are
+    not folded (level 1 at most).
+    hooks["prefix"] starts the run from the program's precomputed input-free prefix (see _prefix).
+    """
+    hooks = hooks or {}
+    on_step = hooks.get("on_step")
+    on_output = hooks.get("on_output")
+    on_render = hooks.get("on_render")
+    tick = hooks.get("tick")
+    poll = hooks.get("poll")
+    on_break = hooks.get("on_break")
+    profile = hooks.get("profile")
+    if profile:
+        level = min(level, 1)   # keep loops unfolded so every loop gets a trip count
+
+    prog = compile_cached(code, level)
+    ops, args, pos = prog
+    prof = profile.attach(code, ir_slots(prog)) if profile else None
+
+    tape = hooks.get("tape") or new_tape(cells, cell_bits, hooks.get("tape_file"))
+    mask = cell_mask(cell_bits)
+    fast_scan = cell_bits == 8
+    ptr = 0
+    ip = 0
+    out = Output(on_output)
+    out_buf, flush_output = out.buf, out.flush
+    read = open_input(hooks.get("input"), hooks.get("eof", 0), before_fill=flush_output).read
+
+    def grow(upto):
+        grow_tape(tape, upto)
+
+    flag = -1
+    if on_render:
+        fb = framebuffer(hooks.get("framebuffer"))
+        render, flag = renderer(tape, fb, on_render), fb.flag
+
+    traps = {}
+    for p in hooks.get("breakpoints") or ():
+        i = op_for_break(prog, code, p)
+        if i < len(ops): traps[i] = pos[i]
+    trapped = list(ops)
+    for i in traps: trapped[i] = BRK
+
+    stepping = not poll and bool(tick or on_step or step_delay > 0.0)
+    countdown = step_hook_rate
+    held = -1   # breakpoint being resumed from
+    budget = Budget(max_steps, timeout, out)
+    steps = 0
+    prefix = prefix_start(code, hooks, level, cell_bits, budget, step_delay)
+    if prefix:
+        ptr, ip, steps = load_prefix(prefix, tape, out), op_at(prog, prefix.pos), prefix.steps
+    next_check = budget.check(steps)   # evaluating the prefix took time too
+
+    n = len(ops)
+    while ip < n:
+        if stepping:
+            if tick: tick()
+            if poll and not poll(tape, ptr):
+                stepping, countdown = False, step_hook_rate
+            # breakpoints apply while stepping too, except the one just reported
+            op = ops[ip] if ip == held else trapped[ip]
+            held = -1
+        else:
+            op = trapped[ip]
+        if op == ADD:
+            tape[ptr] = (tape[ptr] + args[ip]) & mask
+            if ptr == flag and tape[ptr]: render()
+        elif op == MOVE:
+            ptr += args[ip]
+            if ptr >= len(tape): grow(ptr)
+            elif ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+        elif op == JNZ:
+            if prof: prof[ip] += 1
+            if tape[ptr] != 0:
+                ip = args[ip]
+                if steps >= next_check: next_check = budget.check(steps)
+                if poll and not stepping:
+                    countdown -= 1
+                    if not countdown:
+                        countdown = step_hook_rate
+                        stepping = bool(poll(tape, ptr))
+        elif op == JZ:
+            if tape[ptr] == 0: ip = args[ip]
+        elif op == SET:
+            tape[ptr] = args[ip] & mask
+            if ptr == flag and tape[ptr]: render()
+        elif op == MUL:
+            v = tape[ptr]
+            if v:
+                terms = args[ip]
+                if ptr + terms[-1][0] >= len(tape): grow(ptr + terms[-1][0])
+                if ptr + terms[0][0] < 0: raise RuntimeError("Pointer moved left of tape start")
+                for off, k in terms:
+                    tape[ptr+off] = (tape[ptr+off] + v * k) & mask
+                tape[ptr] = 0
+                if flag >= 0 and tape[flag]: render()
+        elif op == SCAN:
+            step = args[ip]
+            if fast_scan and step == 1:
+                ptr = tape.find(b"\0", ptr)
+                if ptr < 0:
+                    ptr = len(tape)
+                    grow(ptr)
+            elif fast_scan and step == -1:
+                ptr = tape.rfind(b"\0", 0, ptr + 1)
+                if ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+            else:
+                while tape[ptr]:
+                    ptr += step
+                    if ptr >= len(tape): grow(ptr)
+                    elif ptr < 0: raise RuntimeError("Pointer moved left of tape start")
+        elif op == OUT:
+            out_buf.append(tape[ptr] & 0xFF)
+            if len(out_buf) >= out.limit: flush_output()
+        elif op == IN:
+            v = read()
+            if v is not None: tape[ptr] = v & mask
+            if ptr == flag and tape[ptr]: render()
+        elif op == BRK:
+            stepping, held = True, ip
+            if on_break: on_break(traps[ip])
+            if on_step: on_step(tape, ptr)
+            continue
+
+        ip += 1
+        steps += 1
+
+        if stepping:
+            if on_step: on_step(tape, ptr)
+            if step_delay > 0.0: time.sleep(step_delay)
+
+    flush_output(final=True)
+    if on_step: on_step(tape, ptr)
+    return steps
@@ -0,0 +1,100 @@
+"""Load generator for the execution service (Studio.py serve).
+
+    python3 Studio.py load --requests 2000 --concurrency 64
+    python3 Studio.py load --program bench/corpus/kernel.bf --distinct 4
+
+Keeps `concurrency` requests in flight until `requests` have completed and reports jobs/sec,
+latency percentiles (request sent to last byte received) and the result statuses. Requests
+cycle through `distinct` different inputs, so --distinct 1 measures coalescing and a large
+value measures the pool itself.
+"""
+import argparse, asyncio, json, time
+
+# hello world, then echo the input
+DEFAULT_PROGRAM = ("++++++++[>++++[>++>+++>+++>+<<<<-]>+>+>->>+[<]<-]>>.>---.+++++++..+++.>>.<-.<.+++.------.--------.>>+.>++."
+                   ">>,[.,]")
+
+async def request(args, body):
+    """POST one job; returns (seconds, final result record)."""
+    t0 = time.perf_counter()
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        writer.write(f"POST /run HTTP/1.1\r\nHost: {args.host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        data = await reader.read()
+    finally:
+        writer.close()
+    head, _, payload = data.partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+    if b"chunked" not in head.lower():
+        return time.perf_counter() - t0, {"status": f"http {status_line.split(' ')[1]}"}
+    text, rest = [], payload
+    while rest:
+        size, _, rest = rest.partition(b"\r\n")
+        n = int(size, 16)
+        if not n:
+            break
+        text.append(rest[:n])
+        rest = rest[n + 2:]
+    last = b"".join(text).rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    return time.perf_counter() - t0, json.loads(last)
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+async def generate(args, program):
+    bodies = [json.dumps({"program": program, "input": f"job {i}\n", "dialect": args.dialect}).encode()
+              for i in range(args.distinct)]
+    latencies, statuses, coalesced = [], {}, 0
+    counter = iter(range(args.requests))
+
+    async def client():
+        nonlocal coalesced
+        for i in counter:
+            try:
+                dt, res = await request(args, bodies[i % len(bodies)])
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                dt, res = 0.0, {"status": f"client error: {type(e).__name__}"}
+            latencies.append(dt)
+            statuses[res["status"]] = statuses.get(res["status"], 0) + 1
+            coalesced += bool(res.get("coalesced"))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return time.perf_counter() - t0, sorted(latencies), statuses, coalesced
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog="Studio.py load", description="Measure the execution service's throughput and latency.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--distinct", type=int, default=1000, help="number of different inputs cycled through")
+    ap.add_argument("--program", help="BF file to submit (default: hello world + echo)")
+    ap.add_argument("--dialect", default="auto")
+    ap.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = ap.parse_args(argv)
+
+    program = DEFAULT_PROGRAM
+    if args.program:
+        with open(args.program, "r", encoding="utf-8") as f:
+            program = f.read()
+    elapsed, lat, statuses, coalesced = asyncio.run(generate(args, program))
+    summary = {"requests": len(lat), "seconds": round(elapsed, 3), "jobs_per_sec": round(len(lat) / elapsed, 1),
+               "p50_ms": round(percentile(lat, 50) * 1000, 2), "p90_ms": round(percentile(lat, 90) * 1000, 2),
+               "p99_ms": round(percentile(lat, 99) * 1000, 2), "max_ms": round(lat[-1] * 1000, 2) if lat else None,
+               "coalesced": coalesced, "statuses": statuses}
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"{summary['requests']} requests in {summary['seconds']}s: {summary['jobs_per_sec']} jobs/s")
+        print(f"latency p50 {summary['p50_ms']} ms, p90 {summary['p90_ms']} ms, p99 {summary['p99_ms']} ms, max {summary['max_ms']} ms")
+        print(f"coalesced {coalesced}; " + ", ".join(f"{k} {v}" for k, v in sorted(statuses.items())))
+    return 0 if statuses.get("ok", 0) == len(lat) else 1
@@ -0,0 +1,302 @@
+"""Local execution service: an asyncio HTTP server in front of a pool of warm worker processes.
+
+    python3 Studio.py serve --port 8787 --workers 4
+    curl -N localhost:8787/run -d '{"program": "++++++++[>++++++++<-]>+.", "input": ""}'
+
+POST /run takes {"program", "input"?, "dialect"?, "max_steps"?, "timeout"?, "max_output"?} and
+streams JSON lines back as the program prints: {"output": text} ..., then one result record
+{"status", "steps", "time", "output_chars", "error"?, "coalesced"} with the statuses of batch
+mode. Requested limits are capped by the server's (--max-steps, --timeout, --max-output).
+GET /stats reports the pool and request counters.
+
+Workers are started, and have imported and run every dialect once, before the server
+accepts connections. Identical submissions (same program, input, dialect and limits) that
+arrive while one is running share that run: later ones replay its output so far and then
+follow it live. Separately, each worker's program cache means resubmitting a program skips
+compiling it again.
+"""
+import argparse, asyncio, importlib, json, multiprocessing, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+GRACE = 1.0          # seconds past a job's timeout before its worker is killed
+MAX_HEADER = 16384
+WARMUP = "++[>+<-]>[-]."
+
+def worker(conn, module_dir, dialects):
+    """Worker process: run jobs from conn one at a time, streaming ("out", text) and ending
+    each with ("done", result)."""
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+    limits = importlib.import_module("_limits")
+    modules = {name: importlib.import_module(name) for name in dialects}
+    for mod in modules.values():
+        mod.run(WARMUP, hooks={"on_output": lambda s: None, "input": b""})
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:   # the server is gone
+            return
+        if job is None:
+            return
+        sent = [0]
+        def on_output(s):
+            room = job["max_output"] - sent[0]
+            if len(s) > room:
+                if room > 0:   # the client still gets everything up to the limit
+                    conn.send(("out", s[:room]))
+                    sent[0] += room
+                raise limits.OutputLimitExceeded(f"Output limit of {job['max_output']} characters exceeded")
+            conn.send(("out", s))
+            sent[0] += len(s)
+        res = {}
+        t0 = time.perf_counter()
+        try:
+            hooks = {"on_output": on_output, "input": job["input"], "prefix": job["prefix"]}
+            res["steps"] = modules[job["dialect"]].run(job["program"], hooks=hooks, max_steps=job["max_steps"],
+                                                      timeout=job["timeout"])
+            res["status"] = "ok"
+        except Exception as e:
+            res["status"], res["error"] = limits.outcome(e)
+        res["time"] = round(time.perf_counter() - t0, 6)
+        res["output_chars"] = sent[0]
+        conn.send(("done", res))
+
+class Worker:
+    def __init__(self, ctx, module_dir, dialects):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=worker, args=(child, module_dir, dialects), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+class Pool:
+    """Fixed-size pool of Worker processes; run() borrows an idle one for a job."""
+    def __init__(self, size, module_dir, dialects):
+        self.size, self.module_dir, self.dialects = size, module_dir, dialects
+        self.ctx = multiprocessing.get_context("spawn")   # the server has threads by the time it replaces a worker
+        self.idle = asyncio.Queue()
+        self.readers = ThreadPoolExecutor(size, thread_name_prefix="pool-reader")   # blocking recv()s
+        self.workers = []
+
+    async def recv(self, w, timeout=None):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self.readers, w.conn.recv), timeout)
+
+    async def spawn(self):
+        w = Worker(self.ctx, self.module_dir, self.dialects)
+        self.workers.append(w)
+        await self.recv(w)    # "ready" once warm
+        self.idle.put_nowait(w)
+
+    async def start(self):
+        await asyncio.gather(*(self.spawn() for _ in range(self.size)))
+
+    async def run(self, job, emit):
+        """Run job on a worker, passing ("out", text) events to emit; returns the result record.
+        A worker that overruns the job's timeout by GRACE (stuck outside the engine's checks)
+        or dies is killed and replaced."""
+        w = await self.idle.get()
+        deadline = time.monotonic() + job["timeout"] + GRACE
+        try:
+            w.conn.send(job)
+            while True:
+                kind, arg = await self.recv(w, max(0.0, deadline - time.monotonic()))
+                if kind == "done":
+                    self.idle.put_nowait(w)
+                    return arg
+                emit((kind, arg))
+        except (asyncio.TimeoutError, EOFError, OSError) as e:
+            self.workers.remove(w)
+            w.kill()
+            asyncio.ensure_future(self.spawn())
+            if isinstance(e, asyncio.TimeoutError):
+                return {"status": "timeout", "error": f"Time limit of {job['timeout']}s exceeded"}
+            return {"status": "error", "error": "Worker process died"}
+
+    def close(self):
+        for w in self.workers:
+            w.kill()
+        self.readers.shutdown(wait=False, cancel_futures=True)
+
+class Job:
+    """One run and everything it has emitted so far, for all the requests following it."""
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.changed = asyncio.Event()
+
+    def emit(self, event):
+        self.events.append(event)
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def finish(self, result):
+        self.done = True
+        self.emit(("done", result))
+
+    async def follow(self):
+        i = 0
+        while True:
+            while i < len(self.events):
+                yield self.events[i]
+                i += 1
+            if self.done:
+                return
+            await self.changed.wait()
+
+class HTTPError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 503: "Service Unavailable"}
+
+class Service:
+    def __init__(self, pool, dialects, pick, args):
+        self.pool, self.dialects, self.pick, self.args = pool, dialects, pick, args
+        self.cache = importlib.import_module("_cache")
+        self.inflight = {}    # coalescing key -> Job
+        self.stats = {"requests": 0, "coalesced": 0, "statuses": {}}
+
+    def make_job(self, req):
+        """Validate a /run request and clamp its limits to the server's."""
+        if not isinstance(req, dict) or not isinstance(req.get("program"), str):
+            raise HTTPError(400, "program (a string) is required")
+        dialect = req.get("dialect") or "auto"
+        if dialect == "auto":
+            dialect = self.pick()
+        if dialect not in self.dialects:
+            raise HTTPError(400, f"Unknown dialect: {dialect}")
+        a = self.args
+        def clamp(name, cap):
+            v = req.get(name)
+            if v is not None and (not isinstance(v, (int, float)) or v < 0):
+                raise HTTPError(400, f"{name} must be a non-negative number")
+            return cap if v is None else v if cap is None else min(v, cap)
+        return {"program": req["program"], "input": str(req.get("input") or "").encode("utf-8"),
+                "dialect": dialect, "max_steps": clamp("max_steps", a.max_steps),
+                "timeout": clamp("timeout", a.timeout), "max_output": clamp("max_output", a.max_output),
+                "prefix": a.prefix}
+
+    async def execute(self, key, job, run):
+        try:
+            result = await self.pool.run(job, run.emit)
+        except Exception as e:
+            result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        finally:
+            del self.inflight[key]
+        statuses = self.stats["statuses"]
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        run.finish(result)
+
+    async def run(self, req, writer):
+        job = self.make_job(req)
+        key = self.cache.ProgramCache.key("serve", job["program"],
+                                          (job["input"], job["dialect"], job["max_steps"], job["timeout"], job["max_output"]))
+        run = self.inflight.get(key)
+        coalesced = run is not None
+        if coalesced:
+            self.stats["coalesced"] += 1
+        else:
+            if len(self.inflight) >= self.pool.size + self.args.max_queue:
+                raise HTTPError(503, "Too many queued jobs")
+            run = self.inflight[key] = Job()
+            asyncio.ensure_future(self.execute(key, job, run))
+        await self.start_response(writer, 200, "application/x-ndjson", chunked=True)
+        async for kind, arg in run.follow():
+            line = {"output": arg} if kind == "out" else dict(arg, coalesced=coalesced)
+            await self.chunk(writer, (json.dumps(line) + "\n").encode())
+        await self.chunk(writer, b"")
+
+    async def start_response(self, writer, code, ctype, body=None, chunked=False):
+        head = [f"HTTP/1.1 {code} {REASONS[code]}", f"Content-Type: {ctype}", "Connection: close"]
+        head.append("Transfer-Encoding: chunked" if chunked else f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + (body or b""))
+        await writer.drain()
+
+    async def chunk(self, writer, data):
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.LimitOverrunError:
+                raise HTTPError(413, "Request header too large")
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = dict(l.split(":", 1) for l in lines[1:] if ":" in l)
+            headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+            path = path.split("?", 1)[0]
+            if path == "/stats":
+                stats = dict(self.stats, active=len(self.inflight), workers=len(self.pool.workers),
+                             idle=self.pool.idle.qsize())
+                await self.start_response(writer, 200, "application/json", json.dumps(stats).encode())
+            elif path == "/run":
+                if method != "POST":
+                    raise HTTPError(405, "Use POST")
+                length = int(headers.get("content-length", 0))
+                if length > self.args.max_program:
+                    raise HTTPError(413, f"Request body over {self.args.max_program} bytes")
+                try:
+                    req = json.loads(await reader.readexactly(length))
+                except ValueError as e:
+                    raise HTTPError(400, f"Bad JSON: {e}")
+                self.stats["requests"] += 1
+                await self.run(req, writer)
+            else:
+                raise HTTPError(404, f"No such endpoint: {path}")
+        except HTTPError as e:
+            await self.start_response(writer, e.code, "application/json", json.dumps({"error": str(e)}).encode())
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass   # client went away or sent garbage
+        finally:
+            writer.close()
+
+def main(argv, module_dir, dialects, pick):
+    """argv: CLI args; module_dir: where the engines live; dialects: their names;
+    pick() -> the dialect "auto" stands for."""
+    ap = argparse.ArgumentParser(prog="Studio.py serve", description="Serve BF runs over local HTTP from a pool of worker processes.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--max-steps", type=int, default=None, help="cap on a job's instruction budget")
+    ap.add_argument("--timeout", type=float, default=10.0, help="cap on a job's wall-clock budget in seconds")
+    ap.add_argument("--max-output", type=int, default=1 << 20, help="cap on a job's output in characters")
+    ap.add_argument("--max-program", type=int, default=1 << 22, help="largest request body in bytes")
+    ap.add_argument("--max-queue", type=int, default=1024, help="jobs waiting for a worker before requests get 503")
+    ap.add_argument("--prefix", action="store_true", help="start jobs from their precomputed input-free prefix")
+    args = ap.parse_args(argv)
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+
+    async def serve():
+        pool = Pool(args.workers, module_dir, dialects)
+        try:
+            await pool.start()
+            service = Service(pool, dialects, pick, args)
+            if args.unix:
+                server = await asyncio.start_unix_server(service.handle, args.unix, limit=MAX_HEADER)
+                where = args.unix
+            else:
+                server = await asyncio.start_server(service.handle, args.host, args.port, limit=MAX_HEADER)
+                where = f"http://{args.host}:{args.port}"
+            print(f"serving on {where} with {args.workers} workers", file=sys.stderr, flush=True)
+            async with server:
+                await server.serve_forever()
+        finally:
+            pool.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -1,18 +1,142 @@
 import ast, os
+from functools import lru_cache
+
+PLUGIN = {"kind": "converter", "source": "python", "target": "bf"}
+
+REGISTERS = 6   # cells 1..REGISTERS keep printed values around; cell 0 is the loop counter
+LOOKAHEAD = 3   # characters considered together when picking a cell
+LONG = 2048     # longer sources are written greedily: lookahead costs ~5x per character
+
+def _wrap(d):
+    """Shortest signed delta reaching d (mod 256)."""
+    d %= 256
+    return d if d <= 128 else d - 256
+
+def _run(d):
+    return ('+' * d) if d >= 0 else ('-' * (-d))
+
+@lru_cache(maxsize=None)
+def factor(d):
+    """Best (a, b, c) with a*b + c == d (mod 256), minimizing a + |b| + |c|:
+    the counter runs a times adding b each time, then c fixes up the rest."""
+    d %= 256
+    best = (abs(_wrap(d)) + 1, 1, 0, _wrap(d))
+    for a in range(2, 33):
+        for b in range(-32, 33):
+            if b:
+                c = _wrap(d - a * b)
+                cost = a + abs(b) + abs(c)
+                if cost < best[0]:
+                    best = (cost, a, b, c)
+    return best[1:]
+
+# cost of reaching a cell value by delta d (mod 256) with a +/- run, and with a loop on
+# cell 0 (before the moves, which depend on the cell)
+DIRECT = [abs(_wrap(d)) for d in range(256)]
+LOOP = [sum(map(abs, factor(d))) + 3 for d in range(256)]
+
+class Writer:
+    """Emits BF that prints byte values, tracking what every work cell holds so each
+    character is built from the cheapest cell: a nearby cell already holding a close value,
+    a run of +/-, or a multiplication loop on cell 0 (see factor), looking `lookahead`
+    characters ahead (1: greedy).
+    """
+    def __init__(self, registers=REGISTERS, lookahead=LOOKAHEAD):
+        self.cells = [0] * (registers + 1)
+        self.ahead = lookahead - 1
+        self.pos = 0
+        self.out = []
+
+    def move(self, to):
+        self.out.append(('>' * (to - self.pos)) if to >= self.pos else ('<' * (self.pos - to)))
+        self.pos = to
+
+    @staticmethod
+    def options(cells, pos, r, target):
+        """(cost, loop) for setting cells[r] to target from pos: a +/- run after moving
+        there, or a multiplication loop counted down on cell 0."""
+        d = (target - cells[r]) & 255
+        direct = abs(pos - r) + DIRECT[d]
+        loop = pos + LOOP[d] + 3 * r
+        return min((direct, False), (loop, True))
+
+    def lookahead(self, cells, pos, values, depth, bound):
+        """Cheapest total cost of printing values[:depth] starting from (cells, pos), or
+        something >= bound once it is clear nothing beats bound."""
+        if not depth or not values:
+            return 0
+        best, value = bound, values[0]
+        for r in range(1, len(cells)):
+            d = (value - cells[r]) & 255
+            cost = min(abs(pos - r) + DIRECT[d], pos + LOOP[d] + 3 * r)
+            if cost >= best:
+                continue
+            old, cells[r] = cells[r], value
+            cost += self.lookahead(cells, r, values[1:], depth - 1, best - cost)
+            cells[r] = old
+            if cost < best:
+                best = cost
+        return best
+
+    def put(self, value, upcoming=()):
+        """Print one byte value from whichever cell gets there cheapest, taking the upcoming
+        values into account."""
+        value %= 256
+        ahead = [v % 256 for v in upcoming]
+        cells, best, pick = self.cells, None, 1
+        for r in range(1, len(cells)):
+            cost = self.options(cells, self.pos, r, value)[0]
+            if ahead and (best is None or cost < best):
+                old, cells[r] = cells[r], value
+                cost += self.lookahead(cells, r, ahead, len(ahead), float("inf") if best is None else best - cost)
+                cells[r] = old
+            if best is None or cost < best:
+                best, pick = cost, r
+        r = pick
+        d = _wrap(value - cells[r])
+        if self.options(cells, self.pos, r, value)[1]:
+            a, b, c = factor(d)
+            self.move(0)
+            fwd, back = '>' * r, '<' * r
+            self.out.append(f"{'+' * a}[{fwd}{_run(b)}{back}-]{fwd}{_run(c)}")
+            self.pos = r
+        else:
+            self.move(r)
+            self.out.append(_run(d))
+        cells[r] = value
+        self.out.append('.')
+
+    def write(self, values):
+        ahead = self.ahead
+        for i, v in enumerate(values):
+            self.put(v, values[i + 1:i + 1 + ahead])
+
+    def clear(self):
+        self.out.append('[-]')
+        self.cells[self.pos] = 0
+
+    def code(self):
+        return ''.join(self.out)
+
+def writer_for(text):
+    """A Writer for converting text: with lookahead up to LONG characters, greedy after."""
+    return Writer(lookahead=LOOKAHEAD if len(text) <= LONG else 1)
 
 def str_to_bf(s: str) -> str:
-    code = []
-    prev = 0
-    for ch in s:
-        diff = ord(ch) - prev
-        code.append(('+' * diff) if diff >= 0 else ('-' * (-diff)))
-        code.append('.')
-        prev = ord(ch)
-    return ''.join(code)
+    w = writer_for(s)
+    w.write([ord(ch) for ch in s])
+    return w.code()
 
 class Visitor(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, writer=None):
         self.out = []
+        self.writer = writer or Writer()   # shared, so each statement starts from the cells the last one left
+
+    def emit(self):
+        code = self.writer.code()
+        if code:
+            self.out.append(code)
+        self.writer.out = []
 
     def visit_Module(self, node):
         for n in node.body:
@@ -20,21 +144,23 @@ class Visitor(ast.NodeVisitor):
 
     def visit_Expr(self, node):
         # handle print("...") or print(123)
+        w = self.writer
         if isinstance(node.value, ast.Call) and getattr(node.value.func, 'id', '') == 'print':
             if node.value.args:
                 arg = node.value.args[0]
                 # Python 3.8+ unified constants
                 if isinstance(arg, ast.Constant):
                     if isinstance(arg.value, str):
-                        self.out.append(str_to_bf(arg.value))
+                        w.write([ord(ch) for ch in arg.value])
                     elif isinstance(arg.value, (int, float)):
-                        self.out.append('+' * int(arg.value) + '.')
+                        w.put(max(int(arg.value), 0))
                     else:
-                        self.out.append('[-]')
+                        w.clear()
                 else:
-                    self.out.append('[-]')
+                    w.clear()
         else:
-            self.out.append('[-]')
+            w.clear()
+        self.emit()
 
 def py_to_bf(src: str) -> str:
     try:
@@ -42,7 +168,7 @@ def py_to_bf(src: str) -> str:
     except Exception:
         # fallback: treat as raw string
         return str_to_bf(src)
-    v = Visitor()
+    v = Visitor(writer_for(src))
     v.visit(tree)
     return "\n".join(v.out)
 
@@ -0,0 +1,8 @@
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for d in ("modules", "bench"):
+    d = os.path.join(ROOT, d)
+    if d not in sys.path:
+        sys.path.insert(0, d)
+os.environ["BFSTUDIO_CACHE"] = "off"   # tests never touch the user's disk cache
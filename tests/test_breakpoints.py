@@ -0,0 +1,36 @@
+import pytest
+import classic, optimized, compiled
+from _machine import Machine
+
+ENGINES = [classic, optimized, compiled]
+
+def hits(engine, code, breakpoints, **hooks):
+    found = []
+    engine.run(code, hooks=dict(hooks, breakpoints=breakpoints, on_break=found.append, on_output=lambda s: None))
+    return found
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stops_before_the_instruction(engine):
+    assert hits(engine, "++.>+.", [3]) == [3]
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("code, bp", [("+++[-]>+.", 5), ("+++[->+<]>.", 6)])
+def test_breakpoint_inside_a_folded_loop(engine, code, bp):
+    # classic stops at the character itself; the IR engines stop before the folded op at '['
+    expected = bp if engine is classic else code.index("[")
+    assert hits(engine, code, [bp])[0] == expected
+
+@pytest.mark.parametrize("engine", [classic, optimized])
+def test_breakpoints_while_stepping_without_poll(engine):
+    assert hits(engine, "+++[>+.<-]", [4], on_step=lambda tape, ptr: None) == [4, 4, 4]
+
+def test_comment_after_an_op_maps_to_the_next_op():
+    assert hits(optimized, "++ note\n>+.", [3]) == [8]
+
+def test_machine_breakpoint_inside_folded_loop():
+    m = Machine("+++[->+<]>.")
+    m.set_breakpoints([6])
+    m.run(100)
+    assert (m.break_at, m.steps, m.tape[0]) == (3, 1, 3)
+    m.run(100)
+    assert m.done and m.take_output() == b"\x03"
@@ -0,0 +1,73 @@
+import hashlib
+import pytest
+import harness
+import classic, optimized, compiled
+from compiled import MAX_NESTING
+
+CORPUS = harness.load_corpus()
+IR_ENGINES = [optimized, compiled]
+
+def deep(n, trips=3):
+    """n loops nested inside each other, none of them foldable; prints 1, 2, ... trips."""
+    return "+" * trips + "[>+" * n + "." + "<-]" * n
+
+@pytest.fixture(scope="module")
+def reference():
+    """optimized's result for every workload: the IR engines must agree on steps too."""
+    return {name: harness.run_once(optimized, w)[1:] for name, w in CORPUS.items()}
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_classic_matches_manifest(name):
+    w = CORPUS[name]
+    _, steps, sha, frames = harness.run_once(classic, w)
+    assert (steps, sha, frames) == (w["bf_steps"], w["output_sha1"], w.get("frames", 0))
+
+@pytest.mark.parametrize("engine", IR_ENGINES)
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_ir_engines_agree(engine, name, reference):
+    w = CORPUS[name]
+    _, steps, sha, frames = harness.run_once(engine, w)
+    assert (sha, frames) == (w["output_sha1"], w.get("frames", 0))
+    assert steps == reference[name][0]
+
+@pytest.mark.parametrize("engine", IR_ENGINES)
+@pytest.mark.parametrize("name", ["hello", "squares", "cat"])
+def test_prefix_keeps_output_and_steps(engine, name):
+    w = CORPUS[name]
+    out = []
+    steps = engine.run(w["code"], hooks={"on_output": out.append, "input": w["input"], "prefix": True})
+    assert hashlib.sha1("".join(out).encode()).hexdigest() == w["output_sha1"]
+    assert steps == harness.run_once(engine, w)[1]
+
+@pytest.mark.parametrize("engine", [classic] + IR_ENGINES)
+def test_nesting_deeper_than_max_nesting(engine):
+    code = deep(MAX_NESTING + 4)
+    out = []
+    engine.run(code, hooks={"on_output": out.append})
+    assert "".join(out) == "\x01\x02\x03"
+
+def test_deep_nesting_step_counts():
+    code = deep(MAX_NESTING + 4)
+    assert compiled.run(code, hooks={"on_output": lambda s: None}) == \
+        optimized.run(code, hooks={"on_output": lambda s: None})
+
+LANE_WORKLOADS = ["hello", "counter", "squares", "scan"]
+
+@pytest.mark.parametrize("name", LANE_WORKLOADS)
+def test_lanes_match_optimized(name, reference):
+    pytest.importorskip("numpy")
+    import _lanes
+    w = CORPUS[name]
+    lane, = _lanes.run(w["code"], [w["input"]])
+    assert lane.status == "ok"
+    assert hashlib.sha1(lane.output).hexdigest() == w["output_sha1"]
+    assert lane.steps == reference[name][0]
+
+def test_lanes_per_input():
+    pytest.importorskip("numpy")
+    import _lanes
+    inputs = [b"", b"abc", b"hello world"]
+    lanes = _lanes.run(CORPUS["cat"]["code"], inputs)
+    assert [l.output for l in lanes] == inputs
+    assert [l.steps for l in lanes] == [optimized.run(CORPUS["cat"]["code"], hooks={"input": d, "on_output": lambda s: None})
+                                        for d in inputs]
@@ -0,0 +1,54 @@
+import harness
+from _history import History
+from _machine import Machine
+
+CORPUS = harness.load_corpus()
+
+def reference(code, input, steps):
+    m = Machine(code, input)
+    m.run(steps)
+    return m
+
+def test_back_and_seek_replay_exactly():
+    w = CORPUS["squares"]
+    h = History(w["code"], w["input"], interval=1000)
+    h.forward(50000)
+    h.back(12345)
+    m = reference(w["code"], w["input"], 50000 - 12345)
+    assert (h.steps, h.machine.ptr, h.machine.tape, bytes(h.output)) == \
+        (m.steps, m.ptr, m.tape, m.take_output())
+    h.seek(49999)
+    assert h.steps == 49999 and h.machine.tape == reference(w["code"], w["input"], 49999).tape
+
+def test_seek_past_a_thinned_history():
+    w = CORPUS["hanoi"]
+    h = History(w["code"], w["input"], interval=64, budget=1 << 16)
+    h.forward(200000)
+    assert len(h.checkpoints) > 1 and h.interval > 64   # thinned to fit the budget
+    h.seek(77777)
+    m = reference(w["code"], w["input"], 77777)
+    assert (h.machine.ip, h.machine.ptr, h.machine.tape) == (m.ip, m.ptr, m.tape)
+
+def test_input_is_replayed_from_the_recording():
+    h = History(",[.,]", b"abcdef", interval=2)
+    h.forward(100)
+    assert h.done and bytes(h.output) == b"abcdef"
+    h.seek(4)
+    assert bytes(h.output) == b"a"
+    h.forward(100)
+    assert bytes(h.output) == b"abcdef"
+
+def test_last_write():
+    code = "+>+<+>>+<<+" + ">" * 3
+    h = History(code, interval=2)
+    h.forward(100)
+    assert h.last_write(0) == 8   # the last '+', back on cell 0
+    assert h.last_write(0) == 4 and h.steps == 4
+    assert h.last_write(2) is None and h.steps == 4   # cell 2 is only written later
+
+def test_output_is_trimmed_to_the_budget():
+    w = CORPUS["cat"]
+    h = History(w["code"], w["input"][:20000], budget=1 << 16)
+    h.forward(10 ** 6)
+    assert h.done and h.trimmed > 0
+    assert bytes(h.output) == w["input"][:20000][h.trimmed:]
@@ -0,0 +1,17 @@
+import pytest
+import compiled
+from _limits import capped_output, OutputLimitExceeded
+
+def test_capped_output_keeps_output_up_to_the_limit():
+    chunks = []
+    on_output = capped_output(chunks, 5)
+    on_output("abc")
+    with pytest.raises(OutputLimitExceeded):
+        on_output("defgh")
+    assert "".join(chunks) == "abcde"
+
+def test_capped_output_on_a_run():
+    chunks = []
+    with pytest.raises(OutputLimitExceeded):
+        compiled.run("+" * 65 + "[.]", hooks={"on_output": capped_output(chunks, 10)})
+    assert "".join(chunks) == "A" * 10
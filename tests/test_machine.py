@@ -0,0 +1,54 @@
+import pytest
+import harness
+from _machine import Machine
+
+CORPUS = harness.load_corpus()
+
+def finish(m):
+    out = m.take_output()
+    while not m.done:
+        m.run(1 << 20)
+        out += m.take_output()
+    return out
+
+@pytest.mark.parametrize("name", ["squares", "hanoi", "cat"])
+def test_snapshot_restore_continues_the_run(name):
+    w = CORPUS[name]
+    whole = Machine(w["code"], w["input"])
+    expected = finish(whole)
+
+    m = Machine(w["code"], w["input"])
+    m.run(12345)
+    head = m.take_output()
+    m.run(54321)
+    blob = m.snapshot()
+    r = Machine.restore(blob)
+    assert (r.ip, r.ptr, r.steps) == (m.ip, m.ptr, m.steps)
+    assert head + finish(r) == expected
+    assert r.steps == whole.steps and r.tape == whole.tape
+
+def test_snapshot_keeps_pending_output_and_unread_input():
+    m = Machine(",[.,]", b"abcdef")
+    m.run(7)     # read and printed "ab", about to print "c"
+    r = Machine.restore(m.snapshot())
+    assert finish(r) == b"abcdef"
+
+def test_restore_rejects_garbage():
+    with pytest.raises(ValueError):
+        Machine.restore(b"not a snapshot")
+
+def test_more_input_waits_for_feed():
+    m = Machine(",[.,]", more_input=True)
+    m.run(100)
+    assert m.waiting and not m.done
+    m.feed(b"hi")
+    m.run(100)
+    assert m.take_output() == b"hi" and m.waiting
+    m.close_input()
+    m.run(100)
+    assert m.done
+
+def test_watch_stops_after_a_write():
+    m = Machine("+>++>+++<[-]")
+    m.run(100, watch=1)
+    assert m.wrote and m.tape[1] == 2 and m.steps == 3
@@ -0,0 +1,47 @@
+import pytest
+import classic, optimized, compiled
+import _prefix
+from _limits import StepLimitExceeded
+
+ENGINES = [classic, optimized, compiled]
+CODE = "++++++++[>++++++++<-]>+.+.,.[-]+++."
+LOOPY = "++++[>+.<-],."    # IR engines check max_steps on loop back-edges, so the limit needs a loop
+
+def run(engine, code, **kw):
+    out = []
+    steps = engine.run(code, hooks={"on_output": out.append, "input": b"z", **kw.pop("hooks", {})}, **kw)
+    return "".join(out), steps
+
+def test_evaluate_stops_at_the_first_read():
+    p = _prefix.evaluate(CODE)
+    assert p.pos == CODE.index(",")
+    assert (p.ptr, p.output) == (1, b"AB")
+    assert p.cells == bytes([0, 66])
+
+def test_evaluate_ends_outside_loops():
+    code = "+" * 5 + "[>" + "+" * 40 + ".<-]>."
+    p = _prefix.evaluate(code, budget=20)
+    assert p.pos == code.index("[")   # the loop was cut short, so it is replayed from its start
+    assert (p.steps, p.output) == (1, b"")
+
+def test_nothing_to_skip():
+    assert _prefix.evaluate(",.") is None
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_prefix_runs_match_plain_runs(engine):
+    assert run(engine, CODE, hooks={"prefix": True}) == run(engine, CODE)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_step_limit_inside_the_prefix(engine):
+    # the prefix needs more steps than allowed, so the run starts from scratch and hits the limit
+    with pytest.raises(StepLimitExceeded) as plain:
+        run(engine, LOOPY, max_steps=5)
+    with pytest.raises(StepLimitExceeded) as with_prefix:
+        run(engine, LOOPY, max_steps=5, hooks={"prefix": True})
+    assert str(with_prefix.value) == str(plain.value)
+
+def test_start_skips_prefix_for_watchers_and_early_breakpoints():
+    assert _prefix.start(CODE, {"prefix": True}, 2) is not None
+    assert _prefix.start(CODE, {"prefix": True, "on_step": print}, 2) is None
+    assert _prefix.start(CODE, {"prefix": True, "breakpoints": [3]}, 2) is None
+    assert _prefix.start(CODE, {"prefix": True, "breakpoints": [len(CODE) - 1]}, 2) is not None
@@ -0,0 +1,23 @@
+import pytest
+import classic, optimized, compiled
+from _profile import Profile
+
+CODE = "++++++++[>++++[-]>+++[->+<]<<-]>>>."
+
+def profile(engine):
+    p = Profile()
+    engine.run(CODE, hooks={"profile": p, "on_output": lambda s: None})
+    return p
+
+@pytest.mark.parametrize("engine", [optimized, compiled])
+def test_ir_engines_match_classic(engine):
+    expected = profile(classic)
+    p = profile(engine)
+    assert p.counts() == expected.counts()
+    assert p.loops() == expected.loops()
+
+def test_clear_and_move_loops_have_trip_counts():
+    loops = {l.open: l for l in profile(compiled).loops()}
+    assert loops[CODE.index("[-]")].iterations == 32
+    assert loops[CODE.index("[->+<]")].iterations == 24
+    assert sum(profile(compiled).counts()) == 317